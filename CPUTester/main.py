@@ -5,12 +5,112 @@ import time
 import psutil
 import multiprocessing
 import math
+import os
+import glob
+import queue
+
+SYSFS_CPU = "/sys/devices/system/cpu"
+SYSFS_NODE = "/sys/devices/system/node"
+
+
+def parse_cpu_list(text):
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def read_sysfs(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def pin_current(cpus):
+    # On Linux affinity is per thread, so pid 0 pins only the calling thread
+    if not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        os.sched_setaffinity(0, set(cpus))
+        return True
+    except OSError:
+        return False
+
+
+def run_kernel_block():
+    for _ in range(1000):
+        math.sqrt(math.factorial(15))
+        math.sin(math.pi * 123.456)
+
+
+def sweep_worker(cpu, duration, start_event, results):
+    if cpu is not None:
+        pin_current([cpu])
+    start_event.wait()
+    end_time = time.perf_counter() + duration
+    blocks = 0
+    while time.perf_counter() < end_time:
+        run_kernel_block()
+        blocks += 1
+    results.put(blocks * 1000)
+
 
 class CPUTester:
     def __init__(self):
         self.is_running = False
         self.workers = []
         self.cpu_count = psutil.cpu_count()
+        self.topology = self.get_cpu_topology()
+    
+    def get_allowed_cpus(self):
+        if hasattr(os, 'sched_getaffinity'):
+            return sorted(os.sched_getaffinity(0))
+        return list(range(self.cpu_count or 1))
+    
+    def get_cpu_topology(self):
+        allowed = self.get_allowed_cpus()
+        cores = {}
+        for cpu in allowed:
+            base = f"{SYSFS_CPU}/cpu{cpu}/topology"
+            package = read_sysfs(f"{base}/physical_package_id")
+            core = read_sysfs(f"{base}/core_id")
+            key = (package, core) if core is not None else ('cpu', cpu)
+            cores.setdefault(key, []).append(cpu)
+        
+        nodes = {}
+        for path in sorted(glob.glob(f"{SYSFS_NODE}/node[0-9]*")):
+            cpulist = read_sysfs(f"{path}/cpulist")
+            if not cpulist:
+                continue
+            node_cpus = [c for c in parse_cpu_list(cpulist) if c in allowed]
+            if node_cpus:
+                nodes[int(os.path.basename(path)[4:])] = node_cpus
+        
+        return {
+            'cpus': allowed,
+            'cores': sorted(cores.values()),
+            'nodes': nodes,
+        }
+    
+    def get_core_sets(self):
+        cores = self.topology['cores']
+        sets = {
+            'all': list(self.topology['cpus']),
+            'physical': [siblings[0] for siblings in cores],
+        }
+        if any(len(siblings) > 1 for siblings in cores):
+            sets['smt'] = [cpu for siblings in cores for cpu in siblings]
+        for node, cpus in self.topology['nodes'].items():
+            sets[f'node{node}'] = cpus
+        return sets
         
     def get_cpu_info(self):
         cpu_percent = psutil.cpu_percent(interval=0.1, percpu=True)
@@ -24,7 +124,10 @@ class CPUTester:
             'freq_max': cpu_freq.max if cpu_freq else 0,
         }
     
-    def cpu_stress_worker(self, duration, target_load):
+    def cpu_stress_worker(self, duration, target_load, cpu=None):
+        if cpu is not None:
+            pin_current([cpu])
+        
         end_time = time.time() + duration
         work_time = target_load / 100.0
         sleep_time = 1.0 - work_time
@@ -43,14 +146,17 @@ class CPUTester:
             if sleep_time > 0 and self.is_running:
                 time.sleep(sleep_time)
     
-    def stress_test(self, num_threads, duration_seconds, target_load, progress_callback=None):
+    def stress_test(self, num_threads, duration_seconds, target_load, progress_callback=None,
+                    core_set=None):
         self.workers = []
         threads = []
+        cpus = self.get_core_sets().get(core_set) if core_set else None
         
         for i in range(num_threads):
+            cpu = cpus[i % len(cpus)] if cpus else None
             thread = threading.Thread(
                 target=self.cpu_stress_worker,
-                args=(duration_seconds, target_load),
+                args=(duration_seconds, target_load, cpu),
                 daemon=True
             )
             threads.append(thread)
@@ -103,15 +209,116 @@ class CPUTester:
         except Exception as e:
             return False, 0
     
+    def get_sweep_steps(self, max_workers):
+        steps = []
+        count = 1
+        while count < max_workers:
+            steps.append(count)
+            count *= 2
+        steps.append(max_workers)
+        return steps
+    
+    def run_parallel_kernel(self, cpus, duration):
+        # Processes rather than threads: the GIL would serialize the kernel
+        start_event = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        self.workers = [
+            multiprocessing.Process(
+                target=sweep_worker,
+                args=(cpu, duration, start_event, results),
+                daemon=True
+            )
+            for cpu in cpus
+        ]
+        for worker in self.workers:
+            worker.start()
+        
+        start_event.set()
+        workers = self.workers
+        total_ops = 0
+        collected = 0
+        try:
+            while collected < len(workers) and self.is_running:
+                try:
+                    total_ops += results.get(timeout=0.5)
+                    collected += 1
+                except queue.Empty:
+                    if not any(worker.is_alive() for worker in workers):
+                        break
+        finally:
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
+            self.workers = []
+        
+        # A partial total would pass for a valid, lower score
+        if collected < len(workers) and self.is_running:
+            raise RuntimeError(
+                f"only {collected} of {len(workers)} workers reported a result"
+            )
+        return total_ops / duration
+    
+    def scaling_sweep(self, core_set='physical', step_duration=2, progress_callback=None):
+        cpus = self.get_core_sets().get(core_set)
+        if not cpus:
+            return False, f"Unknown core set: {core_set}"
+        
+        steps = self.get_sweep_steps(len(cpus))
+        rows = []
+        
+        try:
+            for index, workers in enumerate(steps):
+                if not self.is_running:
+                    return False, rows
+                
+                if progress_callback:
+                    progress = (index / len(steps)) * 100
+                    progress_callback(progress, f"Running {workers} worker(s) on {core_set} cores...")
+                
+                ops_per_sec = self.run_parallel_kernel(cpus[:workers], step_duration)
+                if not self.is_running:
+                    return False, rows
+                base = rows[0]['ops_per_sec'] if rows else ops_per_sec
+                speedup = ops_per_sec / base if base else 0
+                rows.append({
+                    'workers': workers,
+                    'cpus': cpus[:workers],
+                    'ops_per_sec': int(ops_per_sec),
+                    'speedup': speedup,
+                    'efficiency': speedup / workers * 100,
+                })
+            
+            if progress_callback:
+                progress_callback(100, "Sweep completed")
+            
+            return True, rows
+            
+        except Exception as e:
+            return False, str(e)
+    
+    def format_scaling_table(self, rows):
+        lines = [f"{'Workers':>7}  {'Ops/sec':>12}  {'Speedup':>7}  {'Eff.':>6}  CPUs"]
+        for row in rows:
+            cpus = ','.join(str(c) for c in row['cpus'])
+            lines.append(
+                f"{row['workers']:>7}  {row['ops_per_sec']:>12,}  "
+                f"{row['speedup']:>6.2f}x  {row['efficiency']:>5.1f}%  {cpus}"
+            )
+        return '\n'.join(lines)
+    
     def stop(self):
         self.is_running = False
+        for worker in self.workers:
+            if isinstance(worker, multiprocessing.Process) and worker.is_alive():
+                worker.terminate()
 
 
 class CPUTesterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("CPU Testing Utility")
-        self.root.geometry("750x750")
+        self.root.geometry("750x870")
         self.root.resizable(False, False)
         
         self.tester = CPUTester()
@@ -355,6 +562,85 @@ class CPUTesterGUI:
         )
         self.benchmark_btn.grid(row=0, column=2, padx=15)
         
+        sweep_frame = tk.LabelFrame(
+            control_frame,
+            text=" Affinity & Scaling Sweep ",
+            font=('Arial', 11, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['accent'],
+            relief=tk.RAISED,
+            bd=2
+        )
+        sweep_frame.pack(fill=tk.X, pady=8)
+        
+        sweep_inner = tk.Frame(sweep_frame, bg=self.colors['card'])
+        sweep_inner.pack(padx=20, pady=15)
+        
+        tk.Label(
+            sweep_inner,
+            text="Core set:",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=0, padx=8, sticky='w')
+        
+        core_sets = list(self.tester.get_core_sets())
+        self.core_set_var = tk.StringVar(value='physical')
+        self.core_set_combo = ttk.Combobox(
+            sweep_inner,
+            textvariable=self.core_set_var,
+            values=core_sets,
+            width=10,
+            state='readonly'
+        )
+        self.core_set_combo.grid(row=0, column=1, padx=8)
+        
+        tk.Label(
+            sweep_inner,
+            text="Step (sec):",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=2, padx=(20, 8), sticky='w')
+        
+        self.step_duration_entry = tk.Entry(
+            sweep_inner,
+            width=6,
+            font=('Arial', 11),
+            bg='#45475a',
+            fg=self.colors['fg'],
+            insertbackground=self.colors['fg']
+        )
+        self.step_duration_entry.grid(row=0, column=3, padx=8)
+        self.step_duration_entry.insert(0, "2")
+        
+        self.pin_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            sweep_inner,
+            text="Pin stress threads",
+            variable=self.pin_var,
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            selectcolor='#45475a',
+            activebackground=self.colors['card'],
+            font=('Arial', 11)
+        ).grid(row=0, column=4, padx=8)
+        
+        self.sweep_btn = tk.Button(
+            sweep_inner,
+            text="Run Sweep",
+            command=self.run_sweep,
+            bg=self.colors['accent'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=25,
+            pady=5,
+            cursor='hand2'
+        )
+        self.sweep_btn.grid(row=0, column=5, padx=15)
+        
         buttons_frame = tk.Frame(control_frame, bg=self.colors['bg'])
         buttons_frame.pack(fill=tk.X, pady=15)
         
@@ -466,8 +752,12 @@ class CPUTesterGUI:
                 text=f"Remaining: {remaining} sec | CPU: {cpu_percent:.1f}%"
             )
             
+        core_set = self.core_set_var.get() if self.pin_var.get() else None
+        
         def task():
-            result, message = self.tester.stress_test(threads, duration, load, progress_callback)
+            result, message = self.tester.stress_test(
+                threads, duration, load, progress_callback, core_set
+            )
             self.root.after(0, lambda: self.on_stress_complete(result, message))
         
         threading.Thread(target=task, daemon=True).start()
@@ -498,6 +788,34 @@ class CPUTesterGUI:
         
         threading.Thread(target=task, daemon=True).start()
         
+    def run_sweep(self):
+        try:
+            step_duration = float(self.step_duration_entry.get())
+            
+            if step_duration <= 0:
+                messagebox.showerror("Error", "Enter a positive step duration!")
+                return
+                
+        except ValueError:
+            messagebox.showerror("Error", "Enter a valid number!")
+            return
+        
+        core_set = self.core_set_var.get()
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        self.result_label.config(text="")
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, rows = self.tester.scaling_sweep(core_set, step_duration, progress_callback)
+            self.root.after(0, lambda: self.on_sweep_complete(result, rows))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
     def stop_operation(self):
         self.tester.stop()
         self.status_label.config(text="Operation stopped by user")
@@ -532,14 +850,53 @@ class CPUTesterGUI:
         
         self.enable_buttons()
         
+    def on_sweep_complete(self, result, rows):
+        if result:
+            best = max(rows, key=lambda row: row['ops_per_sec'])
+            table = self.tester.format_scaling_table(rows)
+            self.status_label.config(text="Sweep completed")
+            self.result_label.config(
+                text=f"Peak: {best['ops_per_sec']:,} ops/sec at {best['workers']} workers"
+            )
+            self.show_report("Scaling Curve", table)
+        else:
+            if self.tester.is_running:
+                self.status_label.config(text=f"Error: {rows}")
+                messagebox.showerror("Error", str(rows))
+            else:
+                self.status_label.config(text="Operation stopped")
+        
+        self.enable_buttons()
+        
+    def show_report(self, title, text):
+        # A monospace Text keeps the table columns aligned
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        window.configure(bg=self.colors['bg'])
+        
+        report = tk.Text(
+            window,
+            width=80,
+            height=min(30, text.count('\n') + 2),
+            font=('Courier', 11),
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            relief=tk.FLAT
+        )
+        report.insert('1.0', text)
+        report.config(state=tk.DISABLED)
+        report.pack(padx=15, pady=15, fill=tk.BOTH, expand=True)
+        
     def disable_buttons(self):
         self.stress_btn.config(state=tk.DISABLED)
         self.benchmark_btn.config(state=tk.DISABLED)
+        self.sweep_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
     def enable_buttons(self):
         self.stress_btn.config(state=tk.NORMAL)
         self.benchmark_btn.config(state=tk.NORMAL)
+        self.sweep_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.tester.is_running = False
         
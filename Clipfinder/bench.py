@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from main import ClipboardDatabase
+
+
+WORDS = [
+    'alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel',
+    'india', 'juliet', 'kilo', 'lima', 'mike', 'november', 'oscar', 'papa',
+    'quebec', 'romeo', 'sierra', 'tango', 'uniform', 'victor', 'whiskey',
+    'xray', 'yankee', 'zulu', 'import', 'return', 'select', 'function',
+    'password', 'https', 'example', 'docker', 'python', 'commit', 'branch',
+]
+QUERIES = ['', 'py', 'python', 'tango zulu', '"hotel india"', 'docker comm', 'nomatch']
+
+
+def make_clip(rng, index):
+    # Mostly short clips with the odd paragraph, like a real history
+    length = rng.choice([3, 5, 8, 12, 20, 40, 120])
+    return f'{index} ' + ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def report(name, samples):
+    print(
+        f'{name:<22} p50 {percentile(samples, 0.5):8.2f} ms   '
+        f'p95 {percentile(samples, 0.95):8.2f} ms   '
+        f'max {max(samples):8.2f} ms   mean {statistics.mean(samples):8.2f} ms'
+    )
+
+
+def bench_insert(db, rng, rows):
+    # Waiting every so often keeps the write queue from holding every clip
+    started = time.perf_counter()
+    for i in range(rows):
+        future = db.add_entry(make_clip(rng, i))
+        if i % 10_000 == 0:
+            future.result()
+    future.result()
+    elapsed = time.perf_counter() - started
+    print(f'bulk insert            {rows} rows in {elapsed:.1f} s ({rows / elapsed:,.0f} rows/s)')
+
+
+def bench_single_insert(db, rng, rows, samples):
+    # One clip at a time, the way the monitor adds them
+    latencies = []
+    for i in range(samples):
+        started = time.perf_counter()
+        db.add_entry(make_clip(rng, rows + i)).result()
+        latencies.append((time.perf_counter() - started) * 1000)
+    report('single insert', latencies)
+
+
+def bench_search(db, repeats):
+    for query in QUERIES:
+        latencies = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            db.search_entries(query)
+            latencies.append((time.perf_counter() - started) * 1000)
+        report(f'search {query!r}', latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clipfinder storage benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='history size to test at')
+    parser.add_argument('--db', help='database file (default: a temporary file)')
+    parser.add_argument('--samples', type=int, default=200, help='single inserts to time')
+    parser.add_argument('--repeats', type=int, default=20, help='runs per search query')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    directory = None
+    db_path = args.db
+    if db_path is None:
+        directory = tempfile.TemporaryDirectory()
+        db_path = os.path.join(directory.name, 'bench.db')
+    
+    db = ClipboardDatabase(db_path)
+    try:
+        print(f'database: {db_path} (full-text index: {"yes" if db.fts_enabled else "no"})')
+        bench_insert(db, rng, args.rows)
+        bench_single_insert(db, rng, args.rows, args.samples)
+        bench_search(db, args.repeats)
+    finally:
+        db.close()
+        if directory is not None:
+            directory.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,21 +3,103 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import pyperclip
+import argparse
 import sqlite3
 import threading
 import time
 import hashlib
 import ctypes
+import ctypes.util
+import os
+import pathlib
+import queue
+import re
+import select
+import shutil
+import subprocess
+import sys
+import zlib
+from concurrent.futures import Future
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+SCHEMA_VERSION = 2
+SNIPPET_TOKENS = 12
+PREVIEW_CHARS = 100
+# Clips larger than this are not saved at all
+MAX_CLIP_BYTES = 32 * 1024 * 1024
+# Only this much of a clip is kept as searchable text; the full text of
+# longer clips is stored compressed next to it
+MAX_INDEXED_CHARS = 64 * 1024
+# The preview pane shows at most this much, Copy always uses the full clip
+PREVIEW_DISPLAY_CHARS = 200 * 1024
+SEARCH_DEBOUNCE_MS = 150
+SEARCH_BATCH = 25
+# SQLite VM instructions between checks whether a running search is stale
+SEARCH_PROGRESS_STEPS = 1000
+# Writes queued while a transaction runs are committed together with it
+WRITE_BATCH = 500
+# How long closing the app waits for queued writes to commit
+CLOSE_TIMEOUT = 5.0
+# How often the Tk thread runs callbacks posted by worker threads
+UI_POLL_MS = 50
+# How long a watcher blocks before the monitor rechecks whether to stop
+WATCH_TIMEOUT = 1.0
+POLL_INTERVAL_MIN = 0.5
+POLL_INTERVAL_MAX = 5.0
+POLL_BACKOFF = 1.5
+SEQUENCE_POLL_INTERVAL = 0.2
+XFIXES_SET_SELECTION_OWNER_NOTIFY_MASK = 1
+
+
+def make_preview(content):
+    preview = content[:PREVIEW_CHARS * 2].replace('\n', ' ').replace('\r', '').strip()[:PREVIEW_CHARS]
+    if len(content) > PREVIEW_CHARS:
+        preview += "..."
+    return preview
+
+
+def compress(content):
+    data = content.encode('utf-8')
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor().compress(data)
+    return 'zlib', zlib.compress(data)
+
+
+def decompress(codec, data):
+    if codec == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    return zlib.decompress(data).decode('utf-8')
 
 
 class ClipboardDatabase:
-    def __init__(self, db_path="clipfinder.db"):
+    def __init__(
+        self,
+        db_path="clipfinder.db",
+        max_clip_bytes=MAX_CLIP_BYTES,
+        max_indexed_chars=MAX_INDEXED_CHARS
+    ):
         self.db_path = db_path
+        self.max_clip_bytes = max_clip_bytes
+        self.max_indexed_chars = max_indexed_chars
         self.conn = None
+        self.reader = None
+        self.fts_enabled = False
+        self.writes = queue.Queue()
         self.init_database()
+        self.reader = self.connect_reader(check_same_thread=False)
+        self.writer = threading.Thread(target=self.run_writer, daemon=True)
+        self.writer.start()
     
     def init_database(self):
+        # After setup this connection belongs to the writer thread
         self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode = WAL')
+        self.conn.execute('PRAGMA synchronous = NORMAL')
         cursor = self.conn.cursor()
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS clipboard_history (
@@ -31,25 +113,252 @@ class ClipboardDatabase:
             CREATE INDEX IF NOT EXISTS idx_timestamp ON clipboard_history(timestamp DESC)
         ''')
         self.conn.commit()
+        self.migrate()
     
-    def add_entry(self, content):
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    def migrate(self):
+        cursor = self.conn.cursor()
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        # The full-text index is not tied to a version: a database created by
+        # a SQLite without FTS5 gets its index once opened by one that has it
+        if self.has_fts_index():
+            self.fts_enabled = True
+        else:
+            self.create_fts_index()
+        if version < 2:
+            self.add_storage_columns()
+        if version < SCHEMA_VERSION:
+            cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            self.conn.commit()
+    
+    def has_fts_index(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clipboard_fts'"
+        )
+        return cursor.fetchone() is not None
+    
+    def create_fts_index(self):
+        # External-content FTS5 table: the text lives only in clipboard_history,
+        # the triggers keep the index in step with it
         cursor = self.conn.cursor()
         try:
             cursor.execute('''
-                INSERT INTO clipboard_history (content, content_hash)
-                VALUES (?, ?)
-            ''', (content, content_hash))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+                CREATE VIRTUAL TABLE IF NOT EXISTS clipboard_fts USING fts5(
+                    content,
+                    content='clipboard_history',
+                    content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: searching falls back to LIKE
+            return
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_insert AFTER INSERT ON clipboard_history
+            BEGIN
+                INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_delete AFTER DELETE ON clipboard_history
+            BEGIN
+                INSERT INTO clipboard_fts(clipboard_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS clipboard_fts_update AFTER UPDATE OF content ON clipboard_history
+            BEGIN
+                INSERT INTO clipboard_fts(clipboard_fts, rowid, content)
+                VALUES ('delete', old.id, old.content);
+                INSERT INTO clipboard_fts(rowid, content) VALUES (new.id, new.content);
+            END
+        ''')
+        # Index the history recorded before the FTS table existed
+        cursor.execute("INSERT INTO clipboard_fts(clipboard_fts) VALUES ('rebuild')")
+        self.conn.commit()
+        self.fts_enabled = True
     
-    def search_entries(self, query="", limit=100):
+    def add_storage_columns(self):
+        # content keeps the searchable text, data the compressed full text of
+        # clips longer than max_indexed_chars (NULL when content is complete).
+        # sqlite3 commits DDL on its own, so an explicit transaction makes the
+        # whole step, version bump included, apply completely or not at all
+        self.conn.create_function('make_preview', 1, make_preview, deterministic=True)
         cursor = self.conn.cursor()
+        cursor.execute('BEGIN')
+        with self.conn:
+            cursor.execute('ALTER TABLE clipboard_history ADD COLUMN preview TEXT')
+            cursor.execute('ALTER TABLE clipboard_history ADD COLUMN size INTEGER')
+            cursor.execute('ALTER TABLE clipboard_history ADD COLUMN codec TEXT')
+            cursor.execute('ALTER TABLE clipboard_history ADD COLUMN data BLOB')
+            cursor.execute('''
+                UPDATE clipboard_history SET preview = make_preview(content), size = length(content)
+            ''')
+            large = cursor.execute(
+                'SELECT id FROM clipboard_history WHERE size > ?', (self.max_indexed_chars,)
+            ).fetchall()
+            for (entry_id,) in large:
+                content = cursor.execute(
+                    'SELECT content FROM clipboard_history WHERE id = ?', (entry_id,)
+                ).fetchone()[0]
+                codec, data = compress(content)
+                cursor.execute('''
+                    UPDATE clipboard_history SET content = ?, codec = ?, data = ?
+                    WHERE id = ?
+                ''', (content[:self.max_indexed_chars], codec, data, entry_id))
+            cursor.execute('PRAGMA user_version = 2')
+    
+    @staticmethod
+    def build_fts_query(query):
+        # "quoted text" is searched as a phrase, every other word as a prefix.
+        # Punctuation is not indexed, so a term without a word character
+        # ("(", "#", "->") has no tokens and is dropped; a query of nothing
+        # else builds no terms and is searched with LIKE
+        terms = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if re.search(r'\w', phrase):
+                terms.append('"' + phrase.replace('"', '""') + '"')
+            elif re.search(r'\w', word):
+                terms.append('"' + word.replace('"', '""') + '"*')
+        return ' '.join(terms)
+    
+    def run_writer(self):
+        # The only thread that writes. Whatever queued up while the previous
+        # transaction ran goes into the next one, so bursts of clips share a
+        # commit while a lone clip is still written at once
+        while True:
+            batch = [self.writes.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.writes.get_nowait())
+                except queue.Empty:
+                    break
+            writes = [write for write in batch if write is not None]
+            outcomes = []
+            try:
+                self.conn.execute('BEGIN')
+                with self.conn:
+                    for future, statement, args in writes:
+                        outcomes.append(self.run_write(statement, args))
+            except Exception as e:
+                # The commit itself failed, so nothing in the batch was written
+                for future, statement, args in writes:
+                    future.set_exception(e)
+            else:
+                for (future, statement, args), (result, error) in zip(writes, outcomes):
+                    if error is None:
+                        future.set_result(result)
+                    else:
+                        future.set_exception(error)
+            if len(writes) < len(batch):
+                return
+    
+    def run_write(self, statement, args):
+        # Each write gets a savepoint, so a failing one is rolled back on its
+        # own and the rest of the batch still commits
+        self.conn.execute('SAVEPOINT write')
+        try:
+            result = statement(*args)
+        except Exception as e:
+            self.conn.execute('ROLLBACK TO write')
+            self.conn.execute('RELEASE write')
+            return None, e
+        self.conn.execute('RELEASE write')
+        return result, None
+    
+    def submit_write(self, statement, *args):
+        future = Future()
+        self.writes.put((future, statement, args))
+        return future
+    
+    def add_entry(self, content):
+        # Resolves to True once the clip is committed, False for a duplicate
+        # or a clip over max_clip_bytes
+        encoded = content.encode('utf-8')
+        if len(encoded) > self.max_clip_bytes:
+            future = Future()
+            future.set_result(False)
+            return future
+        content_hash = hashlib.sha256(encoded).hexdigest()
+        codec = data = None
+        if len(content) > self.max_indexed_chars:
+            codec, data = compress(content)
+        row = (
+            content[:self.max_indexed_chars],
+            content_hash,
+            make_preview(content),
+            len(content),
+            codec,
+            data
+        )
+        return self.submit_write(self.insert_entry, row)
+    
+    def insert_entry(self, row):
+        cursor = self.conn.execute('''
+            INSERT OR IGNORE INTO clipboard_history (content, content_hash, preview, size, codec, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', row)
+        return cursor.rowcount > 0
+    
+    def get_content(self, entry_id):
+        # Full text of one clip, or None if it was deleted meanwhile
+        cursor = self.reader.cursor()
+        cursor.execute(
+            'SELECT content, codec, data FROM clipboard_history WHERE id = ?', (entry_id,)
+        )
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        content, codec, data = row
+        if data is None:
+            return content
+        if codec == 'zstd' and zstandard is None:
+            # Written by an install with zstandard; the searchable prefix
+            # is the most that can be shown here
+            return content
+        return decompress(codec, data)
+    
+    def connect_reader(self, check_same_thread=True):
+        # Searches use read-only connections; in WAL mode they read a
+        # snapshot and never wait for the writer thread
+        uri = pathlib.Path(self.db_path).absolute().as_uri() + '?mode=ro'
+        return sqlite3.connect(uri, uri=True, check_same_thread=check_same_thread)
+    
+    def search_entries(self, query="", limit=100):
+        return self.search_cursor(self.reader, query, limit).fetchall()
+    
+    def search_cursor(self, conn, query="", limit=100):
+        # Rows are (id, preview, timestamp, snippet); snippet is None unless
+        # the full-text index produced one. A snippet of one long token can
+        # span the whole indexed text, so it is cut one past PREVIEW_CHARS to
+        # show that it was shortened. Full text comes from get_content.
+        # Words only match from their start, so a query the index has no hit
+        # for (a substring inside a word, say) runs as LIKE instead
+        cursor = conn.cursor()
+        fts_query = self.build_fts_query(query) if query and self.fts_enabled else ''
+        if fts_query:
+            try:
+                cursor.execute(
+                    'SELECT 1 FROM clipboard_fts WHERE clipboard_fts MATCH ? LIMIT 1', (fts_query,)
+                )
+                matched = cursor.fetchone() is not None
+            except sqlite3.OperationalError:
+                matched = False
+            if matched:
+                cursor.execute('''
+                    SELECT h.id, h.preview, h.timestamp,
+                           substr(snippet(clipboard_fts, 0, '«', '»', '...', ?), 1, ?)
+                    FROM clipboard_fts
+                    JOIN clipboard_history h ON h.id = clipboard_fts.rowid
+                    WHERE clipboard_fts MATCH ?
+                    ORDER BY clipboard_fts.rank, h.timestamp DESC
+                    LIMIT ?
+                ''', (SNIPPET_TOKENS, PREVIEW_CHARS + 1, fts_query, limit))
+                return cursor
         if query:
             cursor.execute('''
-                SELECT id, content, timestamp
+                SELECT id, preview, timestamp, NULL
                 FROM clipboard_history
                 WHERE content LIKE ?
                 ORDER BY timestamp DESC
@@ -57,30 +366,249 @@ class ClipboardDatabase:
             ''', (f'%{query}%', limit))
         else:
             cursor.execute('''
-                SELECT id, content, timestamp
+                SELECT id, preview, timestamp, NULL
                 FROM clipboard_history
                 ORDER BY timestamp DESC
                 LIMIT ?
             ''', (limit,))
-        return cursor.fetchall()
+        return cursor
     
     def delete_entry(self, entry_id):
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM clipboard_history WHERE id = ?', (entry_id,))
-        self.conn.commit()
+        return self.submit_write(
+            self.conn.execute, 'DELETE FROM clipboard_history WHERE id = ?', (entry_id,)
+        )
     
     def clear_all(self):
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM clipboard_history')
-        self.conn.commit()
+        return self.submit_write(self.conn.execute, 'DELETE FROM clipboard_history')
     
-    def close(self):
-        if self.conn:
+    def close(self, timeout=None):
+        # Pending writes are committed before the writer thread stops. A
+        # writer still busy after timeout keeps its connection and ends with
+        # the process; WAL leaves the database consistent either way
+        self.writes.put(None)
+        self.writer.join(timeout)
+        if self.reader:
+            self.reader.close()
+        if self.conn and not self.writer.is_alive():
             self.conn.close()
 
 
+class XFixesWatcher:
+    # Asks the X server to report every new owner of the CLIPBOARD
+    # selection, so the clipboard is only read after something was copied
+    def __init__(self):
+        if not os.environ.get('DISPLAY'):
+            raise OSError('no X display')
+        self.xlib = ctypes.CDLL(ctypes.util.find_library('X11') or 'libX11.so.6')
+        xfixes = ctypes.CDLL(ctypes.util.find_library('Xfixes') or 'libXfixes.so.3')
+        
+        self.xlib.XOpenDisplay.restype = ctypes.c_void_p
+        self.xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        self.xlib.XDefaultRootWindow.restype = ctypes.c_ulong
+        self.xlib.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self.xlib.XInternAtom.restype = ctypes.c_ulong
+        self.xlib.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        self.xlib.XConnectionNumber.argtypes = [ctypes.c_void_p]
+        self.xlib.XPending.argtypes = [ctypes.c_void_p]
+        self.xlib.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self.xlib.XFlush.argtypes = [ctypes.c_void_p]
+        self.xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xfixes.XFixesQueryExtension.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+        ]
+        xfixes.XFixesSelectSelectionInput.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong
+        ]
+        
+        self.display = self.xlib.XOpenDisplay(None)
+        if not self.display:
+            raise OSError('cannot open X display')
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(
+            self.display, ctypes.byref(event_base), ctypes.byref(error_base)
+        ):
+            self.close()
+            raise OSError('XFixes extension not available')
+        
+        root = self.xlib.XDefaultRootWindow(self.display)
+        clipboard = self.xlib.XInternAtom(self.display, b'CLIPBOARD', False)
+        xfixes.XFixesSelectSelectionInput(
+            self.display, root, clipboard, XFIXES_SET_SELECTION_OWNER_NOTIFY_MASK
+        )
+        self.xlib.XFlush(self.display)
+        self.fd = self.xlib.XConnectionNumber(self.display)
+        # XEvent is a union padded to 24 longs
+        self.event = ctypes.create_string_buffer(ctypes.sizeof(ctypes.c_long) * 24)
+    
+    def wait(self, timeout):
+        if not self.xlib.XPending(self.display):
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return False
+        changed = False
+        while self.xlib.XPending(self.display):
+            self.xlib.XNextEvent(self.display, self.event)
+            changed = True
+        return changed
+    
+    def observed(self, changed):
+        pass
+    
+    def close(self):
+        if self.display:
+            self.xlib.XCloseDisplay(self.display)
+            self.display = None
+
+
+class WaylandWatcher:
+    # wl-paste runs the given command on every clipboard change; echo
+    # turns each change into one line on our pipe
+    def __init__(self):
+        if not os.environ.get('WAYLAND_DISPLAY') or not shutil.which('wl-paste'):
+            raise OSError('wl-paste not available')
+        self.process = subprocess.Popen(
+            ['wl-paste', '--watch', 'echo'],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    
+    def wait(self, timeout):
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            return False
+        if not self.process.stdout.readline():
+            # Compositors without the data-control protocol end the watch
+            raise OSError('wl-paste exited')
+        return True
+    
+    def observed(self, changed):
+        pass
+    
+    def close(self):
+        self.process.terminate()
+        self.process.wait()
+
+
+class SequenceWatcher:
+    # Windows counts clipboard writes; the counter is far cheaper to poll
+    # than reading the clipboard itself
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+        self.sequence = self.user32.GetClipboardSequenceNumber()
+    
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            sequence = self.user32.GetClipboardSequenceNumber()
+            if sequence != self.sequence:
+                self.sequence = sequence
+                return True
+            time.sleep(SEQUENCE_POLL_INTERVAL)
+        return False
+    
+    def observed(self, changed):
+        pass
+    
+    def close(self):
+        pass
+
+
+class PollingWatcher:
+    # Without change notifications the clipboard is read periodically,
+    # less often the longer nothing new shows up
+    def __init__(self):
+        self.interval = POLL_INTERVAL_MIN
+    
+    def wait(self, timeout):
+        time.sleep(self.interval)
+        return True
+    
+    def observed(self, changed):
+        if changed:
+            self.interval = POLL_INTERVAL_MIN
+        else:
+            self.interval = min(self.interval * POLL_BACKOFF, POLL_INTERVAL_MAX)
+    
+    def close(self):
+        pass
+
+
+def open_clipboard_watcher():
+    if sys.platform == 'win32':
+        backends = [SequenceWatcher]
+    else:
+        backends = [WaylandWatcher, XFixesWatcher]
+    for backend in backends:
+        try:
+            return backend()
+        except (OSError, AttributeError):
+            continue
+    return PollingWatcher()
+
+
+class SearchWorker:
+    def __init__(self, db, deliver):
+        # deliver(generation, rows, done) is called from the worker thread
+        # once per batch of results
+        self.db = db
+        self.deliver = deliver
+        self.generation = 0
+        self.active = 0
+        self.pending = None
+        self.running = True
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+    
+    def submit(self, query):
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, query)
+            self.condition.notify()
+            return self.generation
+    
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+    
+    def is_stale(self):
+        return self.active != self.generation or not self.running
+    
+    def run(self):
+        conn = self.db.connect_reader()
+        # A non-zero return aborts the running statement, so a search that
+        # was overtaken by newer input stops instead of running to the end
+        conn.set_progress_handler(self.is_stale, SEARCH_PROGRESS_STEPS)
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    break
+                self.active, query = self.pending
+                self.pending = None
+            try:
+                self.search(conn, self.active, query)
+            except sqlite3.OperationalError:
+                pass
+        conn.close()
+    
+    def search(self, conn, generation, query):
+        cursor = self.db.search_cursor(conn, query)
+        while True:
+            rows = cursor.fetchmany(SEARCH_BATCH)
+            if self.is_stale():
+                return
+            done = len(rows) < SEARCH_BATCH
+            self.deliver(generation, rows, done)
+            if done:
+                return
+
+
 class Clipfinder:
-    def __init__(self, root):
+    def __init__(self, root, db):
         self.root = root
         self.root.title("Clipfinder")
         self.root.geometry("1000x600")
@@ -90,14 +618,21 @@ class Clipfinder:
         except:
             pass
         
-        self.db = ClipboardDatabase()
+        self.db = db
         self.last_clipboard = ""
         self.monitoring = True
         self.selected_entry_id = None
+        self.entry_map = {}
+        self.search_after = None
+        self.search_generation = 0
+        self.shown_generation = 0
+        self.ui_calls = queue.Queue()
+        self.searcher = SearchWorker(self.db, self.deliver_results)
         
         self.setup_ui()
         self.start_monitoring()
         self.refresh_list()
+        self.run_ui_calls()
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -131,7 +666,7 @@ class Clipfinder:
         ttk.Label(search_frame, text="Search:", font=('Segoe UI', 12)).pack(side=tk.LEFT, padx=(0, 10))
         
         self.search_var = tk.StringVar()
-        self.search_var.trace('w', lambda *args: self.refresh_list())
+        self.search_var.trace('w', lambda *args: self.schedule_search())
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=('Segoe UI', 12))
         search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
         
@@ -191,35 +726,88 @@ class Clipfinder:
         self.entries_label = ttk.Label(status_frame, text="", font=('Segoe UI', 10))
         self.entries_label.pack(side=tk.RIGHT)
     
-    def monitor_clipboard(self):
-        while self.monitoring:
+    def capture_clipboard(self):
+        try:
+            current = pyperclip.paste()
+        except Exception:
+            return False
+        if not current or current == self.last_clipboard:
+            return False
+        self.last_clipboard = current
+        self.db.add_entry(current).add_done_callback(self.entry_added)
+        return True
+    
+    def call_soon(self, callback, *args):
+        # Worker threads never touch Tk themselves: a Tk call from another
+        # thread waits for the main loop, which deadlocks while the main
+        # thread is waiting for that worker
+        self.ui_calls.put((callback, args))
+    
+    def run_ui_calls(self):
+        while True:
             try:
-                current = pyperclip.paste()
-                if current and current != self.last_clipboard:
-                    self.last_clipboard = current
-                    if self.db.add_entry(current):
-                        self.root.after(0, self.refresh_list)
-                time.sleep(0.5)
-            except Exception:
-                time.sleep(1)
+                callback, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            callback(*args)
+        self.root.after(UI_POLL_MS, self.run_ui_calls)
+    
+    def entry_added(self, future):
+        if future.exception() is None and future.result():
+            self.call_soon(self.refresh_list)
+    
+    def refresh_after(self, future):
+        # Search only once the write is committed, or it would miss it
+        future.add_done_callback(lambda _: self.call_soon(self.refresh_list))
+    
+    def monitor_clipboard(self):
+        watcher = open_clipboard_watcher()
+        try:
+            self.capture_clipboard()
+            while self.monitoring:
+                try:
+                    changed = watcher.wait(WATCH_TIMEOUT)
+                except OSError:
+                    watcher.close()
+                    watcher = PollingWatcher()
+                    continue
+                if changed:
+                    watcher.observed(self.capture_clipboard())
+        finally:
+            watcher.close()
     
     def start_monitoring(self):
-        thread = threading.Thread(target=self.monitor_clipboard, daemon=True)
-        thread.start()
+        self.monitor_thread = threading.Thread(target=self.monitor_clipboard, daemon=True)
+        self.monitor_thread.start()
+    
+    def schedule_search(self):
+        if self.search_after is not None:
+            self.root.after_cancel(self.search_after)
+        self.search_after = self.root.after(SEARCH_DEBOUNCE_MS, self.refresh_list)
     
     def refresh_list(self):
-        query = self.search_var.get()
-        entries = self.db.search_entries(query)
-        
-        self.history_list.delete(0, tk.END)
-        self.entry_map = {}
+        self.search_after = None
+        self.search_generation = self.searcher.submit(self.search_var.get())
+    
+    def deliver_results(self, generation, entries, done):
+        self.call_soon(self.show_results, generation, entries, done)
+    
+    def show_results(self, generation, entries, done):
+        if generation != self.search_generation:
+            return
+        # The old list stays up until the first batch of the new search arrives
+        if generation != self.shown_generation:
+            self.shown_generation = generation
+            self.history_list.delete(0, tk.END)
+            self.entry_map = {}
         
         for entry in entries:
-            entry_id, content, timestamp = entry
+            entry_id, preview, timestamp, snippet = entry
             
-            preview = content.replace('\n', ' ').replace('\r', '').strip()[:100]
-            if len(content) > 100:
-                preview += "..."
+            if snippet:
+                preview = snippet.replace('\n', ' ').replace('\r', '').strip()
+                if len(snippet) > PREVIEW_CHARS:
+                    preview = preview[:PREVIEW_CHARS] + "..."
             
             time_str = timestamp.split('.')[0] if '.' in timestamp else timestamp
             display = f"{time_str}  |  {preview}"
@@ -227,7 +815,8 @@ class Clipfinder:
             self.history_list.insert(tk.END, display)
             self.entry_map[self.history_list.size() - 1] = entry
         
-        self.entries_label.config(text=f"{len(entries)} entries")
+        if done:
+            self.entries_label.config(text=f"{len(self.entry_map)} entries")
     
     def on_select(self, event):
         selection = self.history_list.curselection()
@@ -238,9 +827,16 @@ class Clipfinder:
         entry = self.entry_map.get(index)
         
         if entry:
-            entry_id, content, timestamp = entry
+            entry_id = entry[0]
+            content = self.db.get_content(entry_id)
+            if content is None:
+                return
             self.selected_entry_id = entry_id
             
+            if len(content) > PREVIEW_DISPLAY_CHARS:
+                hidden = len(content) - PREVIEW_DISPLAY_CHARS
+                content = content[:PREVIEW_DISPLAY_CHARS] + f"\n\n... {hidden} more characters"
+            
             self.preview_text.config(state=tk.NORMAL)
             self.preview_text.delete(1.0, tk.END)
             self.preview_text.insert(1.0, content)
@@ -250,38 +846,36 @@ class Clipfinder:
         if self.selected_entry_id is None:
             return
         
-        content = self.preview_text.get(1.0, tk.END).strip()
-        self.monitoring = False
-        pyperclip.copy(content)
+        content = self.db.get_content(self.selected_entry_id)
+        if content is None:
+            return
         self.last_clipboard = content
+        pyperclip.copy(content)
         
-        self.root.after(500, lambda: setattr(self, 'monitoring', True))
         self.set_status("Copied!")
     
     def delete_entry(self):
         if self.selected_entry_id is None:
             return
         
-        self.db.delete_entry(self.selected_entry_id)
+        self.refresh_after(self.db.delete_entry(self.selected_entry_id))
         self.selected_entry_id = None
         
         self.preview_text.config(state=tk.NORMAL)
         self.preview_text.delete(1.0, tk.END)
         self.preview_text.config(state=tk.DISABLED)
         
-        self.refresh_list()
         self.set_status("Deleted")
     
     def clear_all(self):
         if messagebox.askyesno("Clear All", "Delete all clipboard history?"):
-            self.db.clear_all()
+            self.refresh_after(self.db.clear_all())
             self.selected_entry_id = None
             
             self.preview_text.config(state=tk.NORMAL)
             self.preview_text.delete(1.0, tk.END)
             self.preview_text.config(state=tk.DISABLED)
             
-            self.refresh_list()
             self.set_status("History cleared")
     
     def set_status(self, message):
@@ -289,14 +883,39 @@ class Clipfinder:
         self.root.after(2000, lambda: self.status_label.config(text="Ready"))
     
     def on_closing(self):
+        # Event watchers return within WATCH_TIMEOUT; waiting lets the monitor
+        # close its watcher, or wl-paste would outlive the app
         self.monitoring = False
-        self.db.close()
+        self.monitor_thread.join(WATCH_TIMEOUT * 2)
+        self.searcher.stop()
+        self.db.close(CLOSE_TIMEOUT)
         self.root.destroy()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Clipboard history with search")
+    parser.add_argument('--db', default="clipfinder.db", help="history database file")
+    parser.add_argument(
+        '--max-clip-mb',
+        type=float,
+        default=MAX_CLIP_BYTES / (1024 * 1024),
+        help="clips larger than this are not saved"
+    )
+    parser.add_argument(
+        '--max-indexed-kb',
+        type=int,
+        default=MAX_INDEXED_CHARS // 1024,
+        help="thousands of characters of each clip that search looks at"
+    )
+    args = parser.parse_args()
+    
+    db = ClipboardDatabase(
+        args.db,
+        max_clip_bytes=int(args.max_clip_mb * 1024 * 1024),
+        max_indexed_chars=args.max_indexed_kb * 1024
+    )
     root = tk.Tk()
-    app = Clipfinder(root)
+    app = Clipfinder(root, db)
     root.mainloop()
 
 
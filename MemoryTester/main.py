@@ -1,15 +1,416 @@
-import tkinter as tk
-from tkinter import ttk, messagebox
 import threading
 import time
 import psutil # external lib
 import sys
+import argparse
+import json
+import platform
+import os
+import array
+import ctypes
+import glob
+import mmap
+import multiprocessing
+import queue
+import random
+
+try:
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+except ImportError:
+    tk = None # headless hosts only get the CLI
+
+try:
+    import numpy as np # optional, speeds up buffer generation
+except ImportError:
+    np = None
+
+SYSFS_CACHE = "/sys/devices/system/cpu/cpu0/cache"
+PSI_MEMORY = "/proc/pressure/memory"
+SYSFS_NODE = "/sys/devices/system/node"
+MPOL_BIND = 2
+SYS_MBIND = {'x86_64': 237, 'aarch64': 235, 'ppc64le': 259, 's390x': 268}
+CACHE_LINE = 64
+PAGE_SIZE = mmap.PAGESIZE
+MAX_REPORTED_ERRORS = 32
+# Pattern tests write and check memory in slices of this size, a multiple
+# of the 8-byte pattern word
+VERIFY_SLICE = 1024 * 1024
+RANDOM_SEEDS = [0x5EED, 0xC0FFEE]
+INVERSION_WORDS = [0x0000000000000000, 0x5555555555555555]
+PATTERN_PASSES = {
+    'walking_ones': 64,
+    'moving_inversions': len(INVERSION_WORDS),
+    'address': 1,
+    'random': len(RANDOM_SEEDS),
+}
+LATENCY_SIZES_KB = [
+    16, 32, 64, 128, 256, 512, 1024, 2048, 4096,
+    8192, 16384, 32768, 65536, 131072, 262144
+]
+# Each working set is chased this many times; the fastest run is reported
+# and the gap between it and the median run tells how much noise a step
+# has to beat
+LATENCY_REPEATS = 5
+# Dependent loads per loop iteration, so the loop itself costs less per load
+CHASE_UNROLL = 8
+# A rise in latency is marked as a cache boundary only when it exceeds
+# both this share of the previous latency and this multiple of the
+# run-to-run spread. The interpreter adds tens of nanoseconds to every
+# load, so smaller steps (typically L1 to L2) cannot be told from noise
+BOUNDARY_MIN_RATIO = 0.2
+BOUNDARY_SPREAD_FACTOR = 3
+
+
+def parse_size(text):
+    units = {'K': 1024, 'M': 1024**2, 'G': 1024**3}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(text[:-1]) * units[text[-1]]
+    return int(text)
+
+
+def get_cache_sizes():
+    caches = []
+    for path in sorted(glob.glob(f"{SYSFS_CACHE}/index[0-9]*")):
+        try:
+            with open(f"{path}/type") as f:
+                cache_type = f.read().strip()
+            if cache_type == 'Instruction':
+                continue
+            with open(f"{path}/level") as f:
+                level = int(f.read())
+            with open(f"{path}/size") as f:
+                size = parse_size(f.read())
+        except (OSError, ValueError):
+            continue
+        caches.append((f"L{level}", size))
+    return sorted(caches, key=lambda cache: cache[1])
+
+
+def parse_cpu_list(text):
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def get_numa_nodes():
+    nodes = {}
+    for path in sorted(glob.glob(f"{SYSFS_NODE}/node[0-9]*")):
+        try:
+            with open(f"{path}/cpulist") as f:
+                cpus = parse_cpu_list(f.read())
+        except (OSError, ValueError):
+            continue
+        nodes[int(os.path.basename(path)[4:])] = cpus
+    return nodes
+
+
+def bind_to_node(buffer, node):
+    syscall_nr = SYS_MBIND.get(platform.machine())
+    if syscall_nr is None or not sys.platform.startswith('linux'):
+        raise OSError("Привязка к NUMA-узлу поддерживается только в Linux")
+    
+    view = (ctypes.c_char * len(buffer)).from_buffer(buffer)
+    address = ctypes.addressof(view)
+    del view
+    
+    nodemask = ctypes.c_ulong(1 << node)
+    libc = ctypes.CDLL(None, use_errno=True)
+    result = libc.syscall(
+        ctypes.c_long(syscall_nr),
+        ctypes.c_void_p(address),
+        ctypes.c_ulong(len(buffer)),
+        ctypes.c_int(MPOL_BIND),
+        ctypes.byref(nodemask),
+        ctypes.c_ulong(ctypes.sizeof(nodemask) * 8),
+        ctypes.c_uint(0)
+    )
+    if result != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"mbind на узел {node}: {os.strerror(errno)}")
+
+
+def pin_thread(cpus):
+    # Returns the previous affinity so the caller can restore it
+    if not cpus or not hasattr(os, 'sched_setaffinity'):
+        return None
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cpus)
+    return previous
+
+
+def build_pointer_chain(size_bytes):
+    # One pointer per cache line, linked in a random cycle so that every
+    # load depends on the previous one and the prefetcher cannot help.
+    stride = CACHE_LINE // 8
+    lines = max(2, size_bytes // CACHE_LINE)
+    if np is not None:
+        order = np.random.permutation(lines).astype(np.uint64)
+        chain_np = np.zeros(lines * stride, dtype=np.uint64)
+        chain_np[order * stride] = np.roll(order, -1) * stride
+        chain = array.array('Q')
+        chain.frombytes(chain_np.tobytes())
+        return chain
+    
+    order = list(range(lines))
+    random.shuffle(order)
+    chain = array.array('Q', bytes(lines * stride * 8))
+    for i in range(lines):
+        chain[order[i] * stride] = order[(i + 1) % lines] * stride
+    return chain
+
+
+def create_chunk(size, seed, use_mmap=False, hugepages=False, node=None):
+    placed = hugepages or node is not None
+    if (use_mmap or placed) and hasattr(mmap, 'MAP_ANONYMOUS'):
+        # MAP_POPULATE makes the kernel commit every page inside mmap() itself,
+        # but hugepage and node hints only apply to pages faulted in afterwards
+        populate = 0 if placed else getattr(mmap, 'MAP_POPULATE', 0)
+        chunk = mmap.mmap(-1, size, flags=mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | populate)
+        if hugepages and hasattr(mmap, 'MADV_HUGEPAGE'):
+            chunk.madvise(mmap.MADV_HUGEPAGE)
+        if node is not None:
+            bind_to_node(chunk, node)
+        if populate:
+            return chunk
+    elif placed:
+        raise OSError("Hugepages и NUMA требуют анонимного mmap")
+    elif use_mmap:
+        chunk = mmap.mmap(-1, size)
+    else:
+        chunk = bytearray(size)
+    
+    # One write per page through a strided slice, executed in C
+    pages = len(range(0, size, PAGE_SIZE))
+    chunk[::PAGE_SIZE] = bytes([seed % 256]) * pages
+    return chunk
+
+
+def read_memory_pressure():
+    # Lines look like: some avg10=0.00 avg60=0.00 avg300=0.00 total=0
+    try:
+        with open(PSI_MEMORY) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return None
+    
+    pressure = {}
+    for line in lines:
+        kind, *fields = line.split()
+        for field in fields:
+            key, value = field.split('=')
+            pressure[f"{kind}_{key}"] = float(value)
+    return pressure
+
+
+def fill_words(buffer, word):
+    # Seed one word, then keep doubling the filled prefix with memcpy
+    template = (word & 0xFFFFFFFFFFFFFFFF).to_bytes(8, 'little')
+    view = memoryview(buffer)
+    size = len(view)
+    view[:min(8, size)] = template[:size]
+    filled = min(8, size)
+    while filled < size:
+        step = min(filled, size - filled)
+        view[filled:filled + step] = view[:step]
+        filled += step
+
+
+def random_fill(size, seed):
+    if np is not None:
+        return np.random.default_rng(seed).bytes(size)
+    return random.Random(seed).randbytes(size)
+
+
+def chunk_address(chunk):
+    view = (ctypes.c_char * len(chunk)).from_buffer(chunk)
+    base = ctypes.addressof(view)
+    del view
+    return base
+
+
+def address_slice(base, start, end):
+    # Every 8-byte word holds its own virtual address; slices start on
+    # word boundaries, a trailing partial word stays zero
+    words = (end - start) // 8
+    first = base + start
+    if np is not None:
+        data = (np.arange(words, dtype=np.uint64) * 8 + first).tobytes()
+    else:
+        data = array.array('Q', range(first, first + words * 8, 8)).tobytes()
+    return data + bytes(end - start - len(data))
+
+
+def random_slice(seed, index, start, end):
+    # Seeded per slice, so any slice can be regenerated on its own
+    return random_fill(end - start, (seed << 48) ^ (index << 32) ^ (start // VERIFY_SLICE))
+
+
+def buffers_equal(actual, expected):
+    if np is not None:
+        return np.array_equal(np.frombuffer(actual, np.uint8), np.frombuffer(expected, np.uint8))
+    return actual.tobytes() == expected
+
+
+def find_mismatches(chunk, expected, limit=MAX_REPORTED_ERRORS):
+    if np is not None:
+        actual = np.frombuffer(chunk, np.uint8)
+        wanted = np.frombuffer(expected, np.uint8)
+        offsets = np.flatnonzero(actual != wanted)[:limit]
+        return [(int(i), int(wanted[i]), int(actual[i])) for i in offsets]
+    
+    mismatches = []
+    for start in range(0, len(chunk), PAGE_SIZE):
+        end = start + PAGE_SIZE
+        if chunk[start:end] == expected[start:end]:
+            continue
+        for i in range(start, min(end, len(chunk))):
+            if chunk[i] != expected[i]:
+                mismatches.append((i, expected[i], chunk[i]))
+                if len(mismatches) >= limit:
+                    return mismatches
+    return mismatches
+
+
+def run_pattern(name, chunks, report):
+    # Chunks are written in place and checked VERIFY_SLICE bytes at a time,
+    # so besides the memory under test a worker needs only about one slice.
+    # expected(start, end) returns what chunk bytes start..end should hold.
+    def verify(index, expected):
+        view = memoryview(chunks[index])
+        budget = MAX_REPORTED_ERRORS
+        for start in range(0, len(view), VERIFY_SLICE):
+            end = min(start + VERIFY_SLICE, len(view))
+            wanted = expected(start, end)
+            if buffers_equal(view[start:end], wanted):
+                continue
+            for offset, byte, actual in find_mismatches(view[start:end], wanted, budget):
+                report(name, index, start + offset, byte, actual)
+                budget -= 1
+            if budget <= 0:
+                return
+    
+    def words(word):
+        # One slice of the repeated word; every slice starts word-aligned
+        template = bytearray(min(VERIFY_SLICE, max(len(chunk) for chunk in chunks)))
+        fill_words(template, word)
+        return lambda start, end: memoryview(template)[:end - start]
+    
+    if name == 'walking_ones':
+        for bit in range(64):
+            for chunk in chunks:
+                fill_words(chunk, 1 << bit)
+            expected = words(1 << bit)
+            for index in range(len(chunks)):
+                verify(index, expected)
+            yield
+    
+    elif name == 'moving_inversions':
+        for word in INVERSION_WORDS:
+            pattern = words(word)
+            inverse = words(~word)
+            for chunk in chunks:
+                fill_words(chunk, word)
+            for index, chunk in enumerate(chunks):
+                verify(index, pattern)
+                fill_words(chunk, ~word)
+            for index in reversed(range(len(chunks))):
+                verify(index, inverse)
+                fill_words(chunks[index], word)
+            yield
+    
+    elif name == 'address':
+        for chunk in chunks:
+            base = chunk_address(chunk)
+            for start in range(0, len(chunk), VERIFY_SLICE):
+                end = min(start + VERIFY_SLICE, len(chunk))
+                chunk[start:end] = address_slice(base, start, end)
+        for index, chunk in enumerate(chunks):
+            base = chunk_address(chunk)
+            verify(index, lambda start, end: address_slice(base, start, end))
+        yield
+    
+    elif name == 'random':
+        for seed in RANDOM_SEEDS:
+            for index, chunk in enumerate(chunks):
+                for start in range(0, len(chunk), VERIFY_SLICE):
+                    end = min(start + VERIFY_SLICE, len(chunk))
+                    chunk[start:end] = random_slice(seed, index, start, end)
+            for index in range(len(chunks)):
+                verify(index, lambda start, end: random_slice(seed, index, start, end))
+            yield
+
+
+def fill_worker(worker_id, size, chunk_size, use_mmap, hugepages, node,
+                progress, status, stop_event):
+    parent = os.getppid()
+    chunks = []
+    try:
+        for start in range(0, size, chunk_size):
+            if stop_event.is_set():
+                break
+            chunks.append(create_chunk(
+                min(chunk_size, size - start), len(chunks), use_mmap, hugepages, node
+            ))
+            progress[worker_id] += len(chunks[-1])
+        status[worker_id] = 1
+    except (MemoryError, OSError):
+        status[worker_id] = -1
+        return
+    
+    # Hold the memory until told to stop, or until the parent disappears
+    while not stop_event.wait(timeout=1):
+        if os.getppid() != parent:
+            break
+
+
+def pattern_worker(worker_id, base_offset, size, chunk_size, patterns, use_mmap,
+                   hugepages, node, results):
+    try:
+        chunks = []
+        for start in range(0, size, chunk_size):
+            chunks.append(create_chunk(
+                min(chunk_size, size - start), 0, use_mmap, hugepages, node
+            ))
+        
+        def report(name, index, offset, wanted, actual):
+            results.put(('error', worker_id, {
+                'pattern': name,
+                'offset': base_offset + index * chunk_size + offset,
+                'expected': wanted,
+                'actual': actual,
+            }))
+        
+        for name in patterns:
+            for _ in run_pattern(name, chunks, report):
+                results.put(('tick', worker_id, name))
+        
+        results.put(('done', worker_id, None))
+    except MemoryError:
+        results.put(('failed', worker_id, "Недостаточно памяти"))
+    except Exception as e:
+        results.put(('failed', worker_id, str(e)))
+
 
 class MemoryTester:
     def __init__(self):
         self.allocated_memory = []
         self.chunk_size = 100 * 1024 * 1024
         self.is_running = False
+        self.commit_rate = 0
+        self.fill_processes = []
+        self.fill_progress = None
+        self.fill_stop = None
+        self.hugepages = False
+        self.numa_node = None
         
     def get_memory_info(self):
         memory = psutil.virtual_memory()
@@ -20,36 +421,47 @@ class MemoryTester:
             'percent': memory.percent
         }
     
-    def allocate_memory(self, size_gb, progress_callback=None):
+    def allocate_memory(self, size_gb, progress_callback=None, use_mmap=False):
         size_bytes = int(size_gb * 1024 * 1024 * 1024)
         chunks_needed = size_bytes // self.chunk_size
         remainder = size_bytes % self.chunk_size
+        self.commit_rate = 0
+        start = time.perf_counter()
         
         try:
             for i in range(chunks_needed):
                 if not self.is_running:
                     return False
                     
-                chunk = bytearray(self.chunk_size)
-                for j in range(0, len(chunk), 4096):
-                    chunk[j] = (i + j) % 256
-                self.allocated_memory.append(chunk)
+                self.allocated_memory.append(create_chunk(
+                    self.chunk_size, i, use_mmap, self.hugepages, self.numa_node
+                ))
                 
                 if progress_callback:
                     progress = ((i + 1) / chunks_needed) * 100
                     allocated_mb = (i + 1) * 100
-                    progress_callback(progress, f"Выделено: {allocated_mb} МБ")
+                    elapsed = time.perf_counter() - start
+                    self.commit_rate = (i + 1) * self.chunk_size / elapsed / (1024**3)
+                    progress_callback(
+                        progress,
+                        f"Выделено: {allocated_mb} МБ ({self.commit_rate:.2f} ГБ/с)"
+                    )
             
             if remainder > 0:
                 if not self.is_running:
                     return False
-                chunk = bytearray(remainder)
-                for j in range(0, len(chunk), 4096):
-                    chunk[j] = j % 256
-                self.allocated_memory.append(chunk)
+                self.allocated_memory.append(create_chunk(
+                    remainder, 0, use_mmap, self.hugepages, self.numa_node
+                ))
+            
+            elapsed = time.perf_counter() - start
+            self.commit_rate = size_bytes / elapsed / (1024**3) if elapsed > 0 else 0
             
             if progress_callback:
-                progress_callback(100, f"Выделено: {size_gb:.2f} ГБ")
+                progress_callback(
+                    100,
+                    f"Выделено: {size_gb:.2f} ГБ ({self.commit_rate:.2f} ГБ/с)"
+                )
             
             return True
             
@@ -58,15 +470,89 @@ class MemoryTester:
         except Exception as e:
             return False
     
+    def allocate_parallel(self, size_gb, workers, progress_callback=None, use_mmap=False):
+        size_bytes = int(size_gb * 1024 * 1024 * 1024)
+        share = size_bytes // workers // PAGE_SIZE * PAGE_SIZE
+        self.commit_rate = 0
+        
+        # Workers publish committed bytes and their state through shared memory
+        self.fill_progress = multiprocessing.Array('q', workers, lock=False)
+        status = multiprocessing.Array('b', workers, lock=False)
+        self.fill_stop = multiprocessing.Event()
+        self.fill_processes = [
+            multiprocessing.Process(
+                target=fill_worker,
+                args=(i, share, self.chunk_size, use_mmap, self.hugepages, self.numa_node,
+                      self.fill_progress, status, self.fill_stop),
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        
+        start = time.perf_counter()
+        for process in self.fill_processes:
+            process.start()
+        
+        while True:
+            if not self.is_running:
+                self.stop_workers()
+                return False
+            
+            committed = sum(self.fill_progress)
+            elapsed = time.perf_counter() - start
+            self.commit_rate = committed / elapsed / (1024**3) if elapsed > 0 else 0
+            
+            if progress_callback:
+                progress_callback(
+                    committed / (share * workers) * 100 if share else 100,
+                    f"Выделено: {committed // (1024**2)} МБ ({self.commit_rate:.2f} ГБ/с), "
+                    f"процессов: {workers}"
+                )
+            
+            if any(state == -1 for state in status):
+                self.stop_workers()
+                return False
+            if all(state == 1 for state in status):
+                return True
+            # A worker that died before reporting success (e.g. OOM-killed)
+            # will never update its status
+            if any(
+                not process.is_alive() and state != 1
+                for process, state in zip(self.fill_processes, status)
+            ):
+                self.stop_workers()
+                return False
+            
+            time.sleep(0.1)
+    
+    def stop_workers(self):
+        if not self.fill_processes:
+            return 0
+        
+        size_gb = sum(self.fill_progress) / (1024**3)
+        self.fill_stop.set()
+        for process in self.fill_processes:
+            process.join(timeout=2)
+        for process in self.fill_processes:
+            if process.is_alive():
+                process.terminate()
+                process.join(timeout=1)
+        
+        self.fill_processes = []
+        self.fill_progress = None
+        self.fill_stop = None
+        return size_gb
+    
     def free_memory(self):
+        size_gb = self.stop_workers()
         if self.allocated_memory:
-            size_gb = sum(len(chunk) for chunk in self.allocated_memory) / (1024**3)
+            size_gb += sum(len(chunk) for chunk in self.allocated_memory) / (1024**3)
             self.allocated_memory.clear()
-            return size_gb
-        return 0
+        return size_gb
     
     def fill_max_memory(self, duration_seconds, safety_margin_gb, 
-                       progress_callback=None, countdown_callback=None):
+                       progress_callback=None, countdown_callback=None, use_mmap=False,
+                       workers=1):
         mem_info = self.get_memory_info()
         available_gb = mem_info['available']
         to_allocate = max(0, available_gb - safety_margin_gb)
@@ -74,7 +560,11 @@ class MemoryTester:
         if to_allocate <= 0:
             return False, "Недостаточно свободной памяти"
         
-        if not self.allocate_memory(to_allocate, progress_callback):
+        if workers > 1:
+            allocated = self.allocate_parallel(to_allocate, workers, progress_callback, use_mmap)
+        else:
+            allocated = self.allocate_memory(to_allocate, progress_callback, use_mmap)
+        if not allocated:
             return False, "Ошибка выделения памяти"
         
         try:
@@ -91,13 +581,419 @@ class MemoryTester:
             
         except Exception as e:
             return False, str(e)
+    
+    def sample_pressure(self, chunks, elapsed, last_swap):
+        memory = psutil.virtual_memory()
+        swap = psutil.swap_memory()
+        psi = read_memory_pressure() or {}
+        sample = {
+            'time': round(elapsed, 2),
+            'resident_gb': sum(len(chunk) for chunk in chunks) / (1024**3),
+            'used_percent': memory.percent,
+            'available_gb': memory.available / (1024**3),
+            'swap_used_gb': swap.used / (1024**3),
+            'swap_in_mb': (swap.sin - last_swap.sin) / (1024**2),
+            'swap_out_mb': (swap.sout - last_swap.sout) / (1024**2),
+            'psi_some_avg10': psi.get('some_avg10'),
+            'psi_full_avg10': psi.get('full_avg10'),
+        }
+        return sample, swap
+    
+    def pressure_test(self, target_gb, rate_mb_s, hold_seconds, keep_hot=True,
+                      sample_interval=1.0, progress_callback=None, use_mmap=False):
+        target = int(target_gb * 1024 * 1024 * 1024)
+        rate = rate_mb_s * 1024 * 1024
+        total_time = target / rate + hold_seconds
+        samples = []
+        # Kept apart from allocated_memory so memory from an earlier
+        # Allocate is neither counted, rewritten nor freed here
+        chunks = []
+        allocated = 0
+        seed = 0
+        
+        try:
+            last_swap = psutil.swap_memory()
+            start = time.perf_counter()
+            next_sample = 0
+            
+            while self.is_running:
+                elapsed = time.perf_counter() - start
+                if elapsed >= total_time and allocated >= target:
+                    break
+                
+                wanted = min(target, int(rate * elapsed))
+                while allocated < wanted and self.is_running:
+                    size = min(self.chunk_size, wanted - allocated)
+                    chunks.append(create_chunk(
+                        size, seed, use_mmap, self.hugepages, self.numa_node
+                    ))
+                    allocated += size
+                    seed += 1
+                
+                if elapsed >= next_sample:
+                    if keep_hot:
+                        # Rewriting one byte per page keeps the pages on the active list
+                        for chunk in chunks:
+                            pages = len(range(0, len(chunk), PAGE_SIZE))
+                            chunk[::PAGE_SIZE] = bytes([seed % 256]) * pages
+                    
+                    sample, last_swap = self.sample_pressure(chunks, elapsed, last_swap)
+                    samples.append(sample)
+                    next_sample += sample_interval
+                    
+                    if progress_callback:
+                        psi = sample['psi_some_avg10']
+                        psi_text = f" | PSI: {psi:.1f}%" if psi is not None else ""
+                        progress_callback(
+                            min(100, elapsed / total_time * 100),
+                            f"Занято: {sample['resident_gb']:.2f} ГБ | "
+                            f"Своп: {sample['swap_used_gb']:.2f} ГБ{psi_text}"
+                        )
+                
+                time.sleep(min(0.1, sample_interval))
+            
+            return True, {
+                'target_gb': target_gb,
+                'rate_mb_s': rate_mb_s,
+                'keep_hot': keep_hot,
+                'samples': samples,
+            }
+            
+        except MemoryError:
+            return False, "Недостаточно памяти"
+        except Exception as e:
+            return False, str(e)
+        finally:
+            chunks.clear()
+    
+    def format_pressure_table(self, report):
+        lines = [
+            f"{'Время':>7}  {'Занято, ГБ':>10}  {'ОЗУ, %':>6}  {'Своп, ГБ':>8}  "
+            f"{'Вход, МБ':>8}  {'Выход, МБ':>9}  {'PSI some':>8}  {'PSI full':>8}"
+        ]
+        for sample in report['samples']:
+            some = sample['psi_some_avg10']
+            full = sample['psi_full_avg10']
+            lines.append(
+                f"{sample['time']:>7.1f}  {sample['resident_gb']:>10.2f}  "
+                f"{sample['used_percent']:>6.1f}  {sample['swap_used_gb']:>8.2f}  "
+                f"{sample['swap_in_mb']:>8.1f}  {sample['swap_out_mb']:>9.1f}  "
+                f"{'-' if some is None else f'{some:.2f}':>8}  "
+                f"{'-' if full is None else f'{full:.2f}':>8}"
+            )
+        return '\n'.join(lines)
+    
+    def create_buffer(self, size, node=None):
+        node = self.numa_node if node is None else node
+        if self.hugepages or node is not None:
+            return create_chunk(size, 0, True, self.hugepages, node)
+        return bytearray(size)
+    
+    def measure_bandwidth(self, size_mb=256, repeats=5, progress_callback=None, node=None):
+        size = int(size_mb * 1024 * 1024)
+        
+        try:
+            src = self.create_buffer(size, node)
+            dst = self.create_buffer(size, node)
+            src_view = memoryview(src)
+            dst_view = memoryview(dst)
+            dst_addr = ctypes.addressof((ctypes.c_char * size).from_buffer(dst))
+            
+            # Pre-fault both buffers so page faults are not measured
+            dst_view[:] = src_view
+            
+            kernels = [
+                ('read', size, lambda i: src.find(b'\x01')),
+                ('write', size, lambda i: ctypes.memset(dst_addr, i & 0xFF, size)),
+                # STREAM convention: copy counts bytes read plus bytes written
+                ('copy', 2 * size, lambda i: dst_view.__setitem__(slice(None), src_view)),
+            ]
+            
+            results = {}
+            for step, (name, nbytes, kernel) in enumerate(kernels):
+                best = None
+                for i in range(repeats):
+                    if not self.is_running:
+                        return False, "Операция остановлена"
+                    start = time.perf_counter()
+                    kernel(i)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                results[name] = nbytes / best / (1024**3)
+                
+                if progress_callback:
+                    progress = ((step + 1) / len(kernels)) * 100
+                    progress_callback(progress, f"{name}: {results[name]:.2f} ГБ/с")
+            
+            return True, results
+            
+        except MemoryError:
+            return False, "Недостаточно памяти для буферов"
+        except Exception as e:
+            return False, str(e)
+    
+    def chase_pointers(self, size, accesses, node=None, repeats=LATENCY_REPEATS):
+        # Returns nanoseconds per access for each of the repeated runs
+        chain = build_pointer_chain(size)
+        if self.hugepages or node is not None or self.numa_node is not None:
+            buffer = self.create_buffer(len(chain) * chain.itemsize, node)
+            buffer[:] = chain.tobytes()
+            del chain
+            chain = memoryview(buffer).cast('Q')
+        
+        c = chain
+        idx = 0
+        for _ in range(len(chain) // (CACHE_LINE // 8)):
+            idx = c[idx]
+        
+        # The nested subscripts are CHASE_UNROLL dependent loads per
+        # iteration; without loop overhead the interpreter cost per load is
+        # close to a single subscript
+        loops = max(1, accesses // CHASE_UNROLL)
+        runs = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            for _ in range(loops):
+                idx = c[c[c[c[c[c[c[c[idx]]]]]]]]
+            elapsed = time.perf_counter() - start
+            runs.append(elapsed / (loops * CHASE_UNROLL) * 1e9)
+        return runs
+    
+    def measure_latency(self, max_size_mb=256, accesses=200000, progress_callback=None, node=None):
+        sizes = [kb * 1024 for kb in LATENCY_SIZES_KB if kb <= max_size_mb * 1024]
+        caches = get_cache_sizes()
+        results = []
+        
+        try:
+            for step, size in enumerate(sizes):
+                if not self.is_running:
+                    return False, "Операция остановлена"
+                
+                runs = self.chase_pointers(size, accesses, node)
+                
+                level = next((name for name, limit in caches if size <= limit), 'DRAM')
+                results.append({
+                    'size': size,
+                    'ns': min(runs),
+                    # Median rather than slowest run: one preempted run
+                    # should not hide a real step
+                    'spread_ns': sorted(runs)[len(runs) // 2] - min(runs),
+                    'level': level if caches else '?',
+                })
+                
+                if progress_callback:
+                    progress = ((step + 1) / len(sizes)) * 100
+                    progress_callback(progress, f"{size // 1024} КБ: {results[-1]['ns']:.1f} нс")
+            
+            # The interpreter adds a constant cost per access; the fastest
+            # working set is L1-resident, so subtracting it leaves the penalty.
+            # The smallest set alone is not used, a noisy run there would
+            # make every other penalty negative.
+            base = min((row['ns'] for row in results), default=0)
+            previous = None
+            for row in results:
+                row['penalty_ns'] = row['ns'] - base
+                # A boundary is a rise that noise cannot explain
+                row['boundary'] = False
+                if previous is not None and row['penalty_ns'] > 0:
+                    noise = max(row['spread_ns'], previous['spread_ns'])
+                    rise = row['ns'] - previous['ns']
+                    row['boundary'] = rise > max(
+                        BOUNDARY_MIN_RATIO * previous['ns'], BOUNDARY_SPREAD_FACTOR * noise
+                    )
+                previous = row
+            
+            return True, results
+            
+        except MemoryError:
+            return False, "Недостаточно памяти для буферов"
+        except Exception as e:
+            return False, str(e)
+    
+    def measure_numa(self, size_mb=256, accesses=200000, progress_callback=None):
+        nodes = get_numa_nodes()
+        if not nodes:
+            return False, "NUMA-узлы не найдены"
+        
+        size = int(size_mb * 1024 * 1024)
+        pairs = [(cpu_node, mem_node) for cpu_node in nodes for mem_node in nodes]
+        rows = []
+        
+        try:
+            for step, (cpu_node, mem_node) in enumerate(pairs):
+                if not self.is_running:
+                    return False, "Операция остановлена"
+                
+                previous = pin_thread(nodes[cpu_node])
+                try:
+                    result, bandwidth = self.measure_bandwidth(size_mb, node=mem_node)
+                    if not result:
+                        return False, bandwidth
+                    latency = min(self.chase_pointers(size, accesses, mem_node))
+                finally:
+                    if previous is not None:
+                        os.sched_setaffinity(0, previous)
+                
+                rows.append({
+                    'cpu_node': cpu_node,
+                    'mem_node': mem_node,
+                    'read_gbs': bandwidth['read'],
+                    'write_gbs': bandwidth['write'],
+                    'copy_gbs': bandwidth['copy'],
+                    'latency_ns': latency,
+                })
+                
+                if progress_callback:
+                    progress = ((step + 1) / len(pairs)) * 100
+                    progress_callback(
+                        progress,
+                        f"ЦП {cpu_node} -> память {mem_node}: {latency:.1f} нс"
+                    )
+            
+            local = {row['cpu_node']: row for row in rows if row['cpu_node'] == row['mem_node']}
+            for row in rows:
+                base = local[row['cpu_node']]
+                row['remote_penalty_ns'] = row['latency_ns'] - base['latency_ns']
+                row['bandwidth_ratio'] = row['read_gbs'] / base['read_gbs'] if base['read_gbs'] else 0
+            
+            return True, rows
+            
+        except MemoryError:
+            return False, "Недостаточно памяти для буферов"
+        except Exception as e:
+            return False, str(e)
+    
+    def format_numa_table(self, rows):
+        lines = [
+            f"{'ЦП':>3}  {'Память':>6}  {'Чтение':>7}  {'Запись':>7}  {'Копир.':>7}  "
+            f"{'нс':>7}  {'Штраф, нс':>9}  {'Доля':>5}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row['cpu_node']:>3}  {row['mem_node']:>6}  {row['read_gbs']:>7.2f}  "
+                f"{row['write_gbs']:>7.2f}  {row['copy_gbs']:>7.2f}  {row['latency_ns']:>7.1f}  "
+                f"{row['remote_penalty_ns']:>9.1f}  {row['bandwidth_ratio']:>5.2f}"
+            )
+        return '\n'.join(lines)
+    
+    def pattern_test(self, size_gb, patterns=None, workers=None, progress_callback=None,
+                     use_mmap=False):
+        patterns = patterns or list(PATTERN_PASSES)
+        unknown = [name for name in patterns if name not in PATTERN_PASSES]
+        if unknown:
+            return False, f"Неизвестные шаблоны: {', '.join(unknown)}"
+        
+        size_bytes = int(size_gb * 1024 * 1024 * 1024)
+        workers = max(1, min(workers or psutil.cpu_count() or 1, size_bytes // PAGE_SIZE))
+        share = size_bytes // workers // PAGE_SIZE * PAGE_SIZE
+        if share <= 0:
+            return False, "Слишком маленький объём для проверки"
+        
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=pattern_worker,
+                args=(i, i * share, share, self.chunk_size, patterns, use_mmap,
+                      self.hugepages, self.numa_node, results),
+                daemon=True
+            )
+            for i in range(workers)
+        ]
+        
+        total_ticks = workers * sum(PATTERN_PASSES[name] for name in patterns)
+        ticks = 0
+        finished = 0
+        errors = []
+        error_count = 0
+        failure = None
+        start = time.perf_counter()
+        
+        try:
+            for process in processes:
+                process.start()
+            
+            while finished < workers:
+                if not self.is_running:
+                    return False, "Операция остановлена"
+                try:
+                    kind, worker_id, payload = results.get(timeout=0.5)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        failure = "Рабочий процесс завершился аварийно"
+                        break
+                    continue
+                
+                if kind == 'tick':
+                    ticks += 1
+                    if progress_callback:
+                        progress_callback(
+                            ticks / total_ticks * 100,
+                            f"Шаблон {payload}: ошибок {error_count}"
+                        )
+                elif kind == 'error':
+                    error_count += 1
+                    if len(errors) < MAX_REPORTED_ERRORS:
+                        errors.append(payload)
+                elif kind == 'done':
+                    finished += 1
+                elif kind == 'failed':
+                    failure = payload
+                    break
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join(timeout=1)
+        
+        if failure:
+            return False, failure
+        
+        return True, {
+            'size_gb': share * workers / (1024**3),
+            'workers': workers,
+            'patterns': patterns,
+            'elapsed': time.perf_counter() - start,
+            'error_count': error_count,
+            'errors': sorted(errors, key=lambda error: error['offset']),
+        }
+    
+    def format_pattern_report(self, report):
+        lines = [
+            f"Проверено: {report['size_gb']:.2f} ГБ, процессов: {report['workers']}, "
+            f"время: {report['elapsed']:.1f} сек",
+            f"Шаблоны: {', '.join(report['patterns'])}",
+            f"Ошибок: {report['error_count']}",
+        ]
+        if report['errors']:
+            lines.append("")
+            lines.append(f"{'Смещение':>18}  {'Ожидалось':>9}  {'Прочитано':>9}  Шаблон")
+            for error in report['errors']:
+                lines.append(
+                    f"{error['offset']:>#18x}  {error['expected']:>#9x}  "
+                    f"{error['actual']:>#9x}  {error['pattern']}"
+                )
+        return '\n'.join(lines)
+    
+    def format_latency_table(self, rows):
+        lines = [
+            f"{'Набор':>10}  {'Уровень':>7}  {'нс/доступ':>10}  {'Разброс':>8}  {'Штраф, нс':>10}"
+        ]
+        for row in rows:
+            size = row['size']
+            size_text = f"{size // 1024**2} МБ" if size >= 1024**2 else f"{size // 1024} КБ"
+            marker = "  <- граница" if row['boundary'] else ""
+            lines.append(
+                f"{size_text:>10}  {row['level']:>7}  {row['ns']:>10.1f}  "
+                f"{row['spread_ns']:>8.1f}  {row['penalty_ns']:>10.1f}{marker}"
+            )
+        return '\n'.join(lines)
 
 
 class MemoryTesterGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Утилита тестирования памяти")
-        self.root.geometry("750x700")
+        self.root.geometry("750x1040")
         self.root.resizable(False, False)
         
         self.tester = MemoryTester()
@@ -255,6 +1151,51 @@ class MemoryTesterGUI:
         )
         self.allocate_btn.grid(row=0, column=2, padx=15)
         
+        self.mmap_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            alloc_inner,
+            text="mmap + MAP_POPULATE",
+            variable=self.mmap_var,
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            selectcolor='#45475a',
+            activebackground=self.colors['card'],
+            font=('Arial', 11)
+        ).grid(row=0, column=3, padx=8)
+        
+        self.hugepages_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            alloc_inner,
+            text="Hugepages (THP)",
+            variable=self.hugepages_var,
+            command=self.update_placement,
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            selectcolor='#45475a',
+            activebackground=self.colors['card'],
+            font=('Arial', 11)
+        ).grid(row=1, column=0, columnspan=2, padx=8, pady=(8, 0), sticky='w')
+        
+        tk.Label(
+            alloc_inner,
+            text="NUMA-узел:",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=1, column=2, padx=8, pady=(8, 0), sticky='e')
+        
+        nodes = ["любой"] + [str(node) for node in get_numa_nodes()]
+        self.numa_var = tk.StringVar(value=nodes[0])
+        numa_combo = ttk.Combobox(
+            alloc_inner,
+            textvariable=self.numa_var,
+            values=nodes,
+            width=8,
+            state='readonly'
+        )
+        numa_combo.grid(row=1, column=3, padx=8, pady=(8, 0), sticky='w')
+        numa_combo.bind('<<ComboboxSelected>>', lambda event: self.update_placement())
+        
         fill_frame = tk.LabelFrame(
             control_frame,
             text=" Заполнить до максимума ",
@@ -307,6 +1248,25 @@ class MemoryTesterGUI:
         self.safety_entry.grid(row=0, column=3, padx=8)
         self.safety_entry.insert(0, "2.0")
         
+        tk.Label(
+            fill_inner,
+            text="Процессов:",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=4, padx=(20, 8), sticky='w')
+        
+        self.fill_workers_entry = tk.Entry(
+            fill_inner,
+            width=6,
+            font=('Arial', 11),
+            bg='#45475a',
+            fg=self.colors['fg'],
+            insertbackground=self.colors['fg']
+        )
+        self.fill_workers_entry.grid(row=0, column=5, padx=8)
+        self.fill_workers_entry.insert(0, "1")
+        
         self.fill_btn = tk.Button(
             fill_inner,
             text="Заполнить",
@@ -320,7 +1280,219 @@ class MemoryTesterGUI:
             pady=5,
             cursor='hand2'
         )
-        self.fill_btn.grid(row=0, column=4, padx=15)
+        self.fill_btn.grid(row=0, column=6, padx=15)
+        
+        bench_frame = tk.LabelFrame(
+            control_frame,
+            text=" Скорость памяти ",
+            font=('Arial', 11, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['accent'],
+            relief=tk.RAISED,
+            bd=2
+        )
+        bench_frame.pack(fill=tk.X, pady=8)
+        
+        bench_inner = tk.Frame(bench_frame, bg=self.colors['card'])
+        bench_inner.pack(padx=20, pady=15)
+        
+        tk.Label(
+            bench_inner,
+            text="Буфер (МБ):",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=0, padx=8, sticky='w')
+        
+        self.buffer_entry = tk.Entry(
+            bench_inner,
+            width=12,
+            font=('Arial', 11),
+            bg='#45475a',
+            fg=self.colors['fg'],
+            insertbackground=self.colors['fg']
+        )
+        self.buffer_entry.grid(row=0, column=1, padx=8)
+        self.buffer_entry.insert(0, "256")
+        
+        self.bandwidth_btn = tk.Button(
+            bench_inner,
+            text="Пропускная способность",
+            command=self.measure_bandwidth,
+            bg=self.colors['accent'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=15,
+            pady=5,
+            cursor='hand2'
+        )
+        self.bandwidth_btn.grid(row=0, column=2, padx=(15, 5))
+        
+        self.latency_btn = tk.Button(
+            bench_inner,
+            text="Задержка",
+            command=self.measure_latency,
+            bg=self.colors['accent'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=15,
+            pady=5,
+            cursor='hand2'
+        )
+        self.latency_btn.grid(row=0, column=3, padx=5)
+        
+        self.numa_btn = tk.Button(
+            bench_inner,
+            text="NUMA",
+            command=self.measure_numa,
+            bg=self.colors['accent'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=15,
+            pady=5,
+            cursor='hand2'
+        )
+        self.numa_btn.grid(row=0, column=4, padx=5)
+        
+        pattern_frame = tk.LabelFrame(
+            control_frame,
+            text=" Проверка шаблонами ",
+            font=('Arial', 11, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['accent'],
+            relief=tk.RAISED,
+            bd=2
+        )
+        pattern_frame.pack(fill=tk.X, pady=8)
+        
+        pattern_inner = tk.Frame(pattern_frame, bg=self.colors['card'])
+        pattern_inner.pack(padx=20, pady=15)
+        
+        tk.Label(
+            pattern_inner,
+            text="Размер (ГБ):",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=0, padx=8, sticky='w')
+        
+        self.pattern_size_entry = tk.Entry(
+            pattern_inner,
+            width=10,
+            font=('Arial', 11),
+            bg='#45475a',
+            fg=self.colors['fg'],
+            insertbackground=self.colors['fg']
+        )
+        self.pattern_size_entry.grid(row=0, column=1, padx=8)
+        self.pattern_size_entry.insert(0, "1.0")
+        
+        tk.Label(
+            pattern_inner,
+            text="Процессов:",
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            font=('Arial', 11)
+        ).grid(row=0, column=2, padx=(20, 8), sticky='w')
+        
+        self.workers_entry = tk.Entry(
+            pattern_inner,
+            width=6,
+            font=('Arial', 11),
+            bg='#45475a',
+            fg=self.colors['fg'],
+            insertbackground=self.colors['fg']
+        )
+        self.workers_entry.grid(row=0, column=3, padx=8)
+        self.workers_entry.insert(0, str(psutil.cpu_count() or 1))
+        
+        self.pattern_btn = tk.Button(
+            pattern_inner,
+            text="Проверить",
+            command=self.pattern_test,
+            bg=self.colors['error'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=25,
+            pady=5,
+            cursor='hand2'
+        )
+        self.pattern_btn.grid(row=0, column=4, padx=15)
+        
+        pressure_frame = tk.LabelFrame(
+            control_frame,
+            text=" Нарастающая нагрузка ",
+            font=('Arial', 11, 'bold'),
+            bg=self.colors['card'],
+            fg=self.colors['accent'],
+            relief=tk.RAISED,
+            bd=2
+        )
+        pressure_frame.pack(fill=tk.X, pady=8)
+        
+        pressure_inner = tk.Frame(pressure_frame, bg=self.colors['card'])
+        pressure_inner.pack(padx=20, pady=15)
+        
+        self.pressure_entries = {}
+        for column, (key, text, default) in enumerate([
+            ('target', "Цель (ГБ):", "4.0"),
+            ('rate', "МБ/с:", "100"),
+            ('hold', "Удержание (сек):", "60"),
+        ]):
+            tk.Label(
+                pressure_inner,
+                text=text,
+                bg=self.colors['card'],
+                fg=self.colors['fg'],
+                font=('Arial', 11)
+            ).grid(row=0, column=column * 2, padx=(8 if column == 0 else 12, 4), sticky='w')
+            
+            entry = tk.Entry(
+                pressure_inner,
+                width=6,
+                font=('Arial', 11),
+                bg='#45475a',
+                fg=self.colors['fg'],
+                insertbackground=self.colors['fg']
+            )
+            entry.grid(row=0, column=column * 2 + 1, padx=4)
+            entry.insert(0, default)
+            self.pressure_entries[key] = entry
+        
+        self.keep_hot_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            pressure_inner,
+            text="Горячие",
+            variable=self.keep_hot_var,
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            selectcolor='#45475a',
+            activebackground=self.colors['card'],
+            font=('Arial', 11)
+        ).grid(row=0, column=6, padx=8)
+        
+        self.pressure_btn = tk.Button(
+            pressure_inner,
+            text="Запустить",
+            command=self.pressure_test,
+            bg=self.colors['error'],
+            fg='#1e1e2e',
+            font=('Arial', 11, 'bold'),
+            relief=tk.RAISED,
+            bd=2,
+            padx=15,
+            pady=5,
+            cursor='hand2'
+        )
+        self.pressure_btn.grid(row=0, column=7, padx=10)
         
         buttons_frame = tk.Frame(control_frame, bg=self.colors['bg'])
         buttons_frame.pack(fill=tk.X, pady=15)
@@ -424,8 +1596,10 @@ class MemoryTesterGUI:
             self.progress_bar['value'] = progress
             self.status_label.config(text=message)
             
+        use_mmap = self.mmap_var.get()
+        
         def task():
-            result = self.tester.allocate_memory(size, progress_callback)
+            result = self.tester.allocate_memory(size, progress_callback, use_mmap)
             self.root.after(0, lambda: self.on_allocate_complete(result, size))
         
         threading.Thread(target=task, daemon=True).start()
@@ -434,8 +1608,9 @@ class MemoryTesterGUI:
         try:
             duration = int(self.duration_entry.get())
             safety = float(self.safety_entry.get())
+            workers = int(self.fill_workers_entry.get())
             
-            if duration <= 0 or safety < 0:
+            if duration <= 0 or safety < 0 or workers <= 0:
                 messagebox.showerror("Ошибка", "Введите корректные значения!")
                 return
         except ValueError:
@@ -454,14 +1629,144 @@ class MemoryTesterGUI:
                 text=f"Осталось: {remaining} сек | Память: {mem_percent:.1f}%"
             )
             
+        use_mmap = self.mmap_var.get()
+        
         def task():
             result, message = self.tester.fill_max_memory(
-                duration, safety, progress_callback, countdown_callback
+                duration, safety, progress_callback, countdown_callback, use_mmap, workers
             )
             self.root.after(0, lambda: self.on_fill_complete(result, message))
         
         threading.Thread(target=task, daemon=True).start()
         
+    def update_placement(self):
+        node = self.numa_var.get()
+        self.tester.hugepages = self.hugepages_var.get()
+        self.tester.numa_node = int(node) if node.isdigit() else None
+        
+    def read_buffer_size(self):
+        try:
+            size = float(self.buffer_entry.get())
+            if size <= 0:
+                raise ValueError
+            return size
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите корректный размер буфера!")
+            return None
+        
+    def measure_bandwidth(self):
+        size = self.read_buffer_size()
+        if size is None:
+            return
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, data = self.tester.measure_bandwidth(size, progress_callback=progress_callback)
+            self.root.after(0, lambda: self.on_bandwidth_complete(result, data))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
+    def measure_latency(self):
+        size = self.read_buffer_size()
+        if size is None:
+            return
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, data = self.tester.measure_latency(size, progress_callback=progress_callback)
+            self.root.after(0, lambda: self.on_latency_complete(result, data))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
+    def pattern_test(self):
+        try:
+            size = float(self.pattern_size_entry.get())
+            workers = int(self.workers_entry.get())
+            
+            if size <= 0 or workers <= 0:
+                messagebox.showerror("Ошибка", "Введите корректные значения!")
+                return
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите корректные числа!")
+            return
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        use_mmap = self.mmap_var.get()
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, data = self.tester.pattern_test(
+                size, workers=workers, progress_callback=progress_callback, use_mmap=use_mmap
+            )
+            self.root.after(0, lambda: self.on_pattern_complete(result, data))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
+    def pressure_test(self):
+        try:
+            target = float(self.pressure_entries['target'].get())
+            rate = float(self.pressure_entries['rate'].get())
+            hold = float(self.pressure_entries['hold'].get())
+            
+            if target <= 0 or rate <= 0 or hold < 0:
+                messagebox.showerror("Ошибка", "Введите корректные значения!")
+                return
+        except ValueError:
+            messagebox.showerror("Ошибка", "Введите корректные числа!")
+            return
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        keep_hot = self.keep_hot_var.get()
+        use_mmap = self.mmap_var.get()
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, data = self.tester.pressure_test(
+                target, rate, hold, keep_hot,
+                progress_callback=progress_callback, use_mmap=use_mmap
+            )
+            self.root.after(0, lambda: self.on_pressure_complete(result, data))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
+    def measure_numa(self):
+        size = self.read_buffer_size()
+        if size is None:
+            return
+        
+        self.disable_buttons()
+        self.tester.is_running = True
+        
+        def progress_callback(progress, message):
+            self.progress_bar['value'] = progress
+            self.status_label.config(text=message)
+            
+        def task():
+            result, data = self.tester.measure_numa(size, progress_callback=progress_callback)
+            self.root.after(0, lambda: self.on_numa_complete(result, data))
+        
+        threading.Thread(target=task, daemon=True).start()
+        
     def free_memory(self):
         freed = self.tester.free_memory()
         if freed > 0:
@@ -478,8 +1783,9 @@ class MemoryTesterGUI:
         
     def on_allocate_complete(self, result, size):
         if result:
-            self.status_label.config(text=f"Успешно выделено {size:.2f} ГБ")
-            messagebox.showinfo("Успех", f"Выделено {size:.2f} ГБ памяти")
+            rate = self.tester.commit_rate
+            self.status_label.config(text=f"Успешно выделено {size:.2f} ГБ ({rate:.2f} ГБ/с)")
+            messagebox.showinfo("Успех", f"Выделено {size:.2f} ГБ памяти\nСкорость: {rate:.2f} ГБ/с")
         else:
             if self.tester.is_running:
                 self.status_label.config(text="Ошибка выделения памяти")
@@ -504,20 +1810,113 @@ class MemoryTesterGUI:
         
         self.enable_buttons()
         
+    def on_bandwidth_complete(self, result, data):
+        if result:
+            text = (
+                f"Чтение: {data['read']:.2f} ГБ/с | "
+                f"Запись: {data['write']:.2f} ГБ/с | "
+                f"Копирование: {data['copy']:.2f} ГБ/с"
+            )
+            self.status_label.config(text="Замер пропускной способности завершён")
+            self.countdown_label.config(text=text)
+        else:
+            self.status_label.config(text=data)
+            if self.tester.is_running:
+                messagebox.showerror("Ошибка", data)
+        
+        self.enable_buttons()
+        
+    def on_latency_complete(self, result, data):
+        if result:
+            self.status_label.config(text="Замер задержки завершён")
+            self.show_report("Задержка памяти", self.tester.format_latency_table(data))
+        else:
+            self.status_label.config(text=data)
+            if self.tester.is_running:
+                messagebox.showerror("Ошибка", data)
+        
+        self.enable_buttons()
+        
+    def on_pattern_complete(self, result, data):
+        if result:
+            if data['error_count']:
+                self.status_label.config(text=f"Найдено ошибок: {data['error_count']}")
+            else:
+                self.status_label.config(text="Ошибок не найдено")
+            self.show_report("Проверка шаблонами", self.tester.format_pattern_report(data))
+        else:
+            self.status_label.config(text=data)
+            if self.tester.is_running:
+                messagebox.showerror("Ошибка", data)
+        
+        self.enable_buttons()
+        
+    def on_pressure_complete(self, result, data):
+        if result:
+            self.status_label.config(text="Нагрузка снята, память освобождена")
+            self.show_report("Нарастающая нагрузка", self.tester.format_pressure_table(data))
+        else:
+            self.status_label.config(text=data)
+            if self.tester.is_running:
+                messagebox.showerror("Ошибка", data)
+        
+        self.enable_buttons()
+        
+    def on_numa_complete(self, result, data):
+        if result:
+            self.status_label.config(text="Замер по NUMA-узлам завершён")
+            self.show_report("NUMA-узлы", self.tester.format_numa_table(data))
+        else:
+            self.status_label.config(text=data)
+            if self.tester.is_running:
+                messagebox.showerror("Ошибка", data)
+        
+        self.enable_buttons()
+        
+    def show_report(self, title, text):
+        window = tk.Toplevel(self.root)
+        window.title(title)
+        window.configure(bg=self.colors['bg'])
+        
+        report = tk.Text(
+            window,
+            width=80,
+            height=min(30, text.count('\n') + 2),
+            font=('Courier', 11),
+            bg=self.colors['card'],
+            fg=self.colors['fg'],
+            relief=tk.FLAT
+        )
+        report.insert('1.0', text)
+        report.config(state=tk.DISABLED)
+        report.pack(padx=15, pady=15, fill=tk.BOTH, expand=True)
+        
     def disable_buttons(self):
         self.allocate_btn.config(state=tk.DISABLED)
         self.fill_btn.config(state=tk.DISABLED)
+        self.bandwidth_btn.config(state=tk.DISABLED)
+        self.latency_btn.config(state=tk.DISABLED)
+        self.numa_btn.config(state=tk.DISABLED)
+        self.pattern_btn.config(state=tk.DISABLED)
+        self.pressure_btn.config(state=tk.DISABLED)
         self.free_btn.config(state=tk.DISABLED)
         self.stop_btn.config(state=tk.NORMAL)
         
     def enable_buttons(self):
         self.allocate_btn.config(state=tk.NORMAL)
         self.fill_btn.config(state=tk.NORMAL)
+        self.bandwidth_btn.config(state=tk.NORMAL)
+        self.latency_btn.config(state=tk.NORMAL)
+        self.numa_btn.config(state=tk.NORMAL)
+        self.pattern_btn.config(state=tk.NORMAL)
+        self.pressure_btn.config(state=tk.NORMAL)
         self.free_btn.config(state=tk.NORMAL)
         self.stop_btn.config(state=tk.DISABLED)
         self.tester.is_running = False
         
     def on_closing(self):
+        self.tester.is_running = False
+        self.tester.stop_workers()
         if self.tester.allocated_memory:
             if messagebox.askokcancel("Выход", "Освободить память перед выходом?"):
                 self.tester.free_memory()
@@ -528,7 +1927,173 @@ class MemoryTesterGUI:
         self.root.destroy()
 
 
-def main():
+def _parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="memorytester",
+        description="Тестирование оперативной памяти. Без команды запускается GUI."
+    )
+    parser.add_argument("--json", dest="json_path", help="Куда сохранить JSON-отчёт ('-' для stdout)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Не выводить прогресс")
+    parser.add_argument("--hugepages", action="store_true", help="madvise(MADV_HUGEPAGE) для буферов")
+    parser.add_argument("--numa-node", type=int, default=None, help="Привязать память к NUMA-узлу")
+    commands = parser.add_subparsers(dest="command")
+    
+    allocate = commands.add_parser("allocate", help="Выделить память и удерживать её")
+    allocate.add_argument("--size", type=float, required=True, help="Размер в ГБ")
+    allocate.add_argument("--hold", type=int, default=0, help="Удержание в секундах")
+    allocate.add_argument("--mmap", action="store_true", help="mmap + MAP_POPULATE")
+    
+    fill = commands.add_parser("fill", help="Заполнить память до максимума")
+    fill.add_argument("--duration", type=int, default=60, help="Время в секундах")
+    fill.add_argument("--safety", type=float, default=2.0, help="Запас в ГБ")
+    fill.add_argument("--mmap", action="store_true", help="mmap + MAP_POPULATE")
+    fill.add_argument("--workers", type=int, default=1, help="Число процессов для выделения")
+    
+    bandwidth = commands.add_parser("bandwidth", help="Пропускная способность")
+    bandwidth.add_argument("--size", type=float, default=256, help="Буфер в МБ")
+    bandwidth.add_argument("--repeats", type=int, default=5)
+    
+    latency = commands.add_parser("latency", help="Задержка случайного доступа")
+    latency.add_argument("--max-size", type=float, default=256, help="Наибольший набор в МБ")
+    latency.add_argument("--accesses", type=int, default=200000)
+    
+    numa = commands.add_parser("numa", help="Скорость и задержка по NUMA-узлам")
+    numa.add_argument("--size", type=float, default=256, help="Буфер в МБ")
+    numa.add_argument("--accesses", type=int, default=200000)
+    
+    patterns = commands.add_parser("patterns", help="Проверка шаблонами")
+    patterns.add_argument("--size", type=float, required=True, help="Размер в ГБ")
+    patterns.add_argument("--workers", type=int, default=None, help="Число процессов")
+    patterns.add_argument(
+        "--patterns",
+        default=",".join(PATTERN_PASSES),
+        help=f"Шаблоны через запятую: {', '.join(PATTERN_PASSES)}"
+    )
+    patterns.add_argument("--mmap", action="store_true", help="mmap + MAP_POPULATE")
+    
+    pressure = commands.add_parser("pressure", help="Нарастающая нагрузка")
+    pressure.add_argument("--target", type=float, required=True, help="Цель в ГБ")
+    pressure.add_argument("--rate", type=float, default=100, help="Скорость роста в МБ/с")
+    pressure.add_argument("--hold", type=float, default=60, help="Удержание в секундах")
+    pressure.add_argument("--interval", type=float, default=1.0, help="Период замеров в секундах")
+    pressure.add_argument("--cold", action="store_true", help="Не трогать страницы после выделения")
+    pressure.add_argument("--mmap", action="store_true", help="mmap + MAP_POPULATE")
+    
+    return parser.parse_args(argv)
+
+
+def _run_command(tester, args, progress_callback):
+    if args.command == "allocate":
+        if not tester.allocate_memory(args.size, progress_callback, args.mmap):
+            return False, "Ошибка выделения памяти"
+        for _ in range(args.hold):
+            if not tester.is_running:
+                break
+            time.sleep(1)
+        return True, {'size_gb': args.size, 'commit_rate_gbs': tester.commit_rate}
+    
+    if args.command == "fill":
+        result, message = tester.fill_max_memory(
+            args.duration, args.safety, progress_callback,
+            use_mmap=args.mmap, workers=args.workers
+        )
+        if not result:
+            return False, message
+        return True, {'message': message, 'commit_rate_gbs': tester.commit_rate}
+    
+    if args.command == "bandwidth":
+        result, data = tester.measure_bandwidth(args.size, args.repeats, progress_callback)
+        if result:
+            data = {f"{name}_gbs": value for name, value in data.items()}
+        return result, data
+    
+    if args.command == "latency":
+        return tester.measure_latency(args.max_size, args.accesses, progress_callback)
+    
+    if args.command == "numa":
+        return tester.measure_numa(args.size, args.accesses, progress_callback)
+    
+    if args.command == "patterns":
+        names = [name.strip() for name in args.patterns.split(",") if name.strip()]
+        return tester.pattern_test(args.size, names, args.workers, progress_callback, args.mmap)
+    
+    if args.command == "pressure":
+        return tester.pressure_test(
+            args.target, args.rate, args.hold, not args.cold,
+            args.interval, progress_callback, args.mmap
+        )
+    
+    return False, f"Неизвестная команда: {args.command}"
+
+
+def run_cli(args):
+    tester = MemoryTester()
+    tester.is_running = True
+    tester.hugepages = args.hugepages
+    tester.numa_node = args.numa_node
+    
+    def progress_callback(progress, message):
+        if not args.quiet:
+            print(f"[{progress:5.1f}%] {message}", file=sys.stderr)
+    
+    started = time.time()
+    try:
+        result, data = _run_command(tester, args, progress_callback)
+    except KeyboardInterrupt:
+        tester.is_running = False
+        result, data = False, "Операция остановлена"
+    finally:
+        tester.free_memory()
+    
+    report = {
+        'host': platform.node(),
+        'command': args.command,
+        'arguments': {k: v for k, v in vars(args).items() if k not in ('command', 'json_path', 'quiet')},
+        'started': started,
+        'elapsed': time.time() - started,
+        'memory': tester.get_memory_info(),
+        'numpy': np is not None,
+        'ok': result,
+        'result': data if result else None,
+        'error': None if result else data,
+    }
+    
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.json_path == "-":
+        print(text)
+    elif args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    elif result and args.command == "latency":
+        print(tester.format_latency_table(data))
+    elif result and args.command == "numa":
+        print(tester.format_numa_table(data))
+    elif result and args.command == "patterns":
+        print(tester.format_pattern_report(data))
+    elif result and args.command == "pressure":
+        print(tester.format_pressure_table(data))
+    else:
+        print(json.dumps(report['result'] if result else report['error'], ensure_ascii=False, indent=2))
+    
+    if not result:
+        return 1
+    if args.command == "patterns" and data['error_count']:
+        return 2
+    return 0
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    args = _parse_args(argv)
+    
+    if args.command:
+        sys.exit(run_cli(args))
+    
+    if tk is None:
+        print("tkinter недоступен, используйте команды CLI (--help)", file=sys.stderr)
+        sys.exit(1)
+    
     root = tk.Tk()
     app = MemoryTesterGUI(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
@@ -0,0 +1,165 @@
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+
+# Raw probe rows are kept this long, then rolled up into hourly rows
+RAW_RETENTION_DAYS = 7
+HOURLY_RETENTION_DAYS = 400
+BATCH_SIZE = 500
+ROLLUP_INTERVAL_S = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    ts REAL NOT NULL,
+    host TEXT NOT NULL,
+    ok INTEGER NOT NULL,
+    latency_ms REAL
+);
+CREATE INDEX IF NOT EXISTS idx_results_host_ts ON results(host, ts);
+CREATE INDEX IF NOT EXISTS idx_results_ts ON results(ts);
+CREATE TABLE IF NOT EXISTS hourly (
+    host TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    probes INTEGER NOT NULL,
+    up INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_count INTEGER NOT NULL,
+    latency_min REAL,
+    latency_max REAL,
+    PRIMARY KEY (host, hour)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_hourly_hour ON hourly(hour);
+"""
+
+# Per-hour aggregates of raw rows, in the same shape as the hourly table
+RAW_HOURS = """
+    SELECT host, CAST(ts / 3600 AS INTEGER) * 3600 AS hour, COUNT(*) AS probes,
+           SUM(ok) AS up, TOTAL(latency_ms) AS latency_sum,
+           COUNT(latency_ms) AS latency_count,
+           MIN(latency_ms) AS latency_min, MAX(latency_ms) AS latency_max
+    FROM results
+"""
+
+
+class HistoryStore:
+    # Takes records like an output writer does, so it can be passed along
+    # with the --format writer
+    def __init__(self, path: str) -> None:
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+        self._pending: List[Tuple[float, str, int, float | None]] = []
+        self._last_rollup = 0.0
+
+    def write(self, record: Dict) -> None:
+        self._pending.append(
+            (record["timestamp"], record["host"], int(record["ok"]), record["latency_ms"])
+        )
+        if len(self._pending) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT INTO results (ts, host, ok, latency_ms) VALUES (?, ?, ?, ?)",
+                    self._pending,
+                )
+            self._pending.clear()
+        if time.time() - self._last_rollup >= ROLLUP_INTERVAL_S:
+            self.rollup()
+
+    def rollup(self, now: float | None = None) -> None:
+        # Cut on an hour boundary so one hour is never split between tables
+        now = time.time() if now is None else now
+        cutoff = int(now - RAW_RETENTION_DAYS * 86400) // 3600 * 3600
+        with self.conn:
+            self.conn.execute(
+                f"""
+                INSERT INTO hourly
+                {RAW_HOURS} WHERE ts < ? GROUP BY host, hour
+                ON CONFLICT (host, hour) DO UPDATE SET
+                    probes = probes + excluded.probes,
+                    up = up + excluded.up,
+                    latency_sum = latency_sum + excluded.latency_sum,
+                    latency_count = latency_count + excluded.latency_count,
+                    latency_min = min(
+                        coalesce(latency_min, excluded.latency_min),
+                        coalesce(excluded.latency_min, latency_min)
+                    ),
+                    latency_max = max(
+                        coalesce(latency_max, excluded.latency_max),
+                        coalesce(excluded.latency_max, latency_max)
+                    )
+                """,
+                (cutoff,),
+            )
+            self.conn.execute("DELETE FROM results WHERE ts < ?", (cutoff,))
+            self.conn.execute(
+                "DELETE FROM hourly WHERE hour < ?",
+                (now - HOURLY_RETENTION_DAYS * 86400,),
+            )
+        self._last_rollup = now
+
+    def _hours(self, since: float, hosts: List[str] | None) -> Tuple[str, list]:
+        # Union of rolled-up and raw hours; the outer queries re-aggregate,
+        # so an hour present in both tables is still counted once per probe
+        host_filter = ""
+        host_params: list = []
+        if hosts:
+            host_filter = f" AND host IN ({', '.join('?' * len(hosts))})"
+            host_params = list(hosts)
+        sql = (
+            "SELECT host, hour, probes, up, latency_sum, latency_count, latency_min, latency_max "
+            f"FROM hourly WHERE hour >= ?{host_filter} "
+            f"UNION ALL {RAW_HOURS} WHERE ts >= ?{host_filter} GROUP BY host, hour"
+        )
+        start_hour = int(since) // 3600 * 3600
+        return sql, [start_hour, *host_params, since, *host_params]
+
+    def uptime(self, since: float, hosts: List[str] | None = None) -> List[Tuple]:
+        # (host, probes, uptime %, average latency ms)
+        hours, params = self._hours(since, hosts)
+        return self.conn.execute(
+            f"""
+            SELECT host, SUM(probes), 100.0 * SUM(up) / SUM(probes),
+                   SUM(latency_sum) / NULLIF(SUM(latency_count), 0)
+            FROM ({hours}) GROUP BY host ORDER BY host
+            """,
+            params,
+        ).fetchall()
+
+    def latency_trend(self, since: float, hosts: List[str] | None = None) -> List[Tuple]:
+        # (host, hour start, probes, uptime %, avg, min, max latency ms)
+        hours, params = self._hours(since, hosts)
+        return self.conn.execute(
+            f"""
+            SELECT host, hour, SUM(probes), 100.0 * SUM(up) / SUM(probes),
+                   SUM(latency_sum) / NULLIF(SUM(latency_count), 0),
+                   MIN(latency_min), MAX(latency_max)
+            FROM ({hours}) GROUP BY host, hour ORDER BY host, hour
+            """,
+            params,
+        ).fetchall()
+
+    def worst_hosts(
+        self, since: float, limit: int = 10, hosts: List[str] | None = None
+    ) -> List[Tuple]:
+        # Lowest uptime first, slowest first among equals
+        hours, params = self._hours(since, hosts)
+        return self.conn.execute(
+            f"""
+            SELECT host, SUM(probes), 100.0 * SUM(up) / SUM(probes) AS uptime,
+                   SUM(latency_sum) / NULLIF(SUM(latency_count), 0) AS latency
+            FROM ({hours}) GROUP BY host
+            ORDER BY uptime ASC, latency DESC LIMIT ?
+            """,
+            [*params, limit],
+        ).fetchall()
+
+    def close(self, up_count: int = 0, down_count: int = 0) -> None:
+        self.flush()
+        self.conn.close()
+
+    def abort(self) -> None:
+        # Results collected before an interruption are still worth keeping
+        self.close()
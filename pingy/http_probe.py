@@ -0,0 +1,237 @@
+import asyncio
+import socket
+import ssl
+import time
+import urllib.parse
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+MAX_IDLE_PER_HOST = 2
+MAX_HEADER_LINES = 100
+
+Connection = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+@dataclass
+class HttpTiming:
+    ok: bool
+    status: int
+    message: str
+    method: str = "HEAD"
+    dns_ms: float | None = None
+    connect_ms: float | None = None
+    tls_ms: float | None = None
+    ttfb_ms: float | None = None
+    total_ms: float | None = None
+    reused: bool = False
+
+
+class _ConnectionClosed(Exception):
+    pass
+
+
+def build_http_url(host: str) -> str:
+    parsed = urllib.parse.urlparse(host)
+    if not parsed.scheme:
+        return f"http://{host}"
+    return host
+
+
+class HttpChecker:
+    def __init__(self, timeout_ms: int = 2000) -> None:
+        self.timeout_s = max(1.0, timeout_ms / 1000.0)
+        self._context = ssl.create_default_context()
+        self._idle: Dict[Tuple[str, str, int], List[Connection]] = {}
+
+    async def _open(
+        self,
+        scheme: str,
+        host: str,
+        port: int,
+        timing: HttpTiming,
+        address: str | None = None,
+    ) -> Connection:
+        if address is None:
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            infos = await asyncio.wait_for(
+                loop.getaddrinfo(host, port, type=socket.SOCK_STREAM), self.timeout_s
+            )
+            infos.sort(key=lambda info: info[0] != socket.AF_INET)
+            address = infos[0][4][0]
+            timing.dns_ms = (time.perf_counter() - started) * 1000.0
+
+        secure = scheme == "https"
+        # Streams can only be upgraded to TLS in place since Python 3.11;
+        # before that connect and handshake are timed together
+        upgrade = secure and hasattr(asyncio.StreamWriter, "start_tls")
+        started = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                address,
+                port,
+                ssl=self._context if secure and not upgrade else None,
+                server_hostname=host if secure and not upgrade else None,
+            ),
+            self.timeout_s,
+        )
+        timing.connect_ms = (time.perf_counter() - started) * 1000.0
+
+        if upgrade:
+            started = time.perf_counter()
+            await asyncio.wait_for(
+                writer.start_tls(self._context, server_hostname=host), self.timeout_s
+            )
+            timing.tls_ms = (time.perf_counter() - started) * 1000.0
+        return reader, writer
+
+    async def _read_head(
+        self, reader: asyncio.StreamReader
+    ) -> Tuple[str, int, str, Dict[str, str]]:
+        status_line = await asyncio.wait_for(reader.readline(), self.timeout_s)
+        if not status_line:
+            raise _ConnectionClosed()
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise ValueError("bad HTTP response")
+
+        headers: Dict[str, str] = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await asyncio.wait_for(reader.readline(), self.timeout_s)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        reason = parts[2].strip() if len(parts) > 2 else ""
+        return parts[0].upper(), int(parts[1]), reason, headers
+
+    async def _drain_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bool:
+        # Returns True when the body was fully consumed and the connection
+        # can be reused for the next request
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                size_line = await asyncio.wait_for(reader.readline(), self.timeout_s)
+                size = int(size_line.split(b";")[0].strip() or b"0", 16)
+                await asyncio.wait_for(reader.readexactly(size + 2), self.timeout_s)
+                if size == 0:
+                    return True
+        length = headers.get("content-length")
+        if length is None or not length.isdigit():
+            return False
+        await asyncio.wait_for(reader.readexactly(int(length)), self.timeout_s)
+        return True
+
+    async def _request(
+        self,
+        connection: Connection,
+        method: str,
+        netloc: str,
+        path: str,
+        timing: HttpTiming,
+    ) -> Tuple[int, str, bool]:
+        reader, writer = connection
+        request = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {netloc}\r\n"
+            "User-Agent: pingy\r\n"
+            "Connection: keep-alive\r\n\r\n"
+        )
+        started = time.perf_counter()
+        writer.write(request.encode("ascii"))
+        await writer.drain()
+        version, status, reason, headers = await self._read_head(reader)
+        timing.ttfb_ms = (time.perf_counter() - started) * 1000.0
+
+        # HTTP/1.1 is persistent unless told otherwise, HTTP/1.0 only on request
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            reusable = connection == "keep-alive"
+        else:
+            reusable = connection != "close"
+        if method != "HEAD" and reusable:
+            reusable = await self._drain_body(reader, headers)
+        return status, reason, reusable
+
+    def _take_idle(self, key: Tuple[str, str, int]) -> Connection | None:
+        idle = self._idle.get(key)
+        while idle:
+            reader, writer = idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer
+            writer.close()
+        return None
+
+    def _put_idle(self, key: Tuple[str, str, int], connection: Connection) -> None:
+        idle = self._idle.setdefault(key, [])
+        if len(idle) < MAX_IDLE_PER_HOST:
+            idle.append(connection)
+        else:
+            connection[1].close()
+
+    async def check(self, host: str, address: str | None = None) -> HttpTiming:
+        # With an address from the resolver stage no lookup is done here
+        parsed = urllib.parse.urlparse(build_http_url(host))
+        scheme = parsed.scheme
+        port = parsed.port or (443 if scheme == "https" else 80)
+        path = parsed.path or "/"
+        if parsed.query:
+            path += "?" + parsed.query
+        key = (scheme, parsed.hostname or "", port)
+
+        timing = HttpTiming(False, 0, "")
+        started = time.perf_counter()
+        connection = None
+        try:
+            for method in ("HEAD", "GET"):
+                timing.method = method
+                connection = self._take_idle(key)
+                timing.reused = connection is not None
+                if connection is None:
+                    connection = await self._open(scheme, key[1], port, timing, address)
+                try:
+                    status, reason, reusable = await self._request(
+                        connection, method, parsed.netloc, path, timing
+                    )
+                except (_ConnectionClosed, ConnectionResetError, BrokenPipeError):
+                    if not timing.reused:
+                        raise
+                    # The server dropped an idle connection; retry on a fresh one
+                    connection[1].close()
+                    connection = await self._open(scheme, key[1], port, timing, address)
+                    timing.reused = False
+                    status, reason, reusable = await self._request(
+                        connection, method, parsed.netloc, path, timing
+                    )
+
+                if reusable:
+                    self._put_idle(key, connection)
+                else:
+                    connection[1].close()
+                connection = None
+
+                # Some servers do not implement HEAD; ask again with GET
+                if method == "HEAD" and status in (405, 501):
+                    continue
+                timing.status = status
+                timing.ok = 200 <= status < 400
+                timing.message = "" if timing.ok else reason or "HTTP error"
+                break
+        except asyncio.TimeoutError:
+            timing.message = "timed out"
+        except _ConnectionClosed:
+            timing.message = "connection closed"
+        except ssl.SSLError as e:
+            timing.message = e.reason or "TLS error"
+        except Exception as e:
+            timing.message = str(e)
+        finally:
+            if connection is not None:
+                connection[1].close()
+            timing.total_ms = (time.perf_counter() - started) * 1000.0
+        return timing
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
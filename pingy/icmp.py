@@ -0,0 +1,258 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+from typing import Dict, Tuple
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+ICMP6_ECHO_REQUEST = 128
+ICMP6_ECHO_REPLY = 129
+ICMP6_UNREACHABLE = 1
+ICMP6_TIME_EXCEEDED = 3
+
+DEFAULT_TTL = 64
+
+# Linux error queue of ping sockets; the constants are missing from the
+# socket module on most Python versions
+IP_RECVERR = getattr(socket, "IP_RECVERR", 11)
+IPV6_RECVERR = getattr(socket, "IPV6_RECVERR", 25)
+MSG_ERRQUEUE = getattr(socket, "MSG_ERRQUEUE", 0x2000)
+SO_EE_ORIGIN_ICMP = 2
+SO_EE_ORIGIN_ICMP6 = 3
+
+# How a probe was answered
+REPLY = "reply"
+TTL_EXCEEDED = "ttl"
+UNREACHABLE = "unreachable"
+
+# Same meaning as the exit codes of the ping command
+RC_OK = 0
+RC_NO_REPLY = 1
+RC_ERROR = 2
+
+
+def _checksum(data: bytes) -> int:
+    if len(data) % 2:
+        data += b"\0"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def _open_socket(family: int) -> socket.socket:
+    proto = socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6
+    try:
+        # Unprivileged "ping socket", allowed by net.ipv4.ping_group_range
+        sock = socket.socket(family, socket.SOCK_DGRAM, proto)
+    except PermissionError:
+        sock = socket.socket(family, socket.SOCK_RAW, proto)
+    try:
+        # Replies to a sweep arrive in bursts; a small buffer would drop them
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+    except OSError:
+        pass
+    sock.setblocking(False)
+    return sock
+
+
+def native_icmp_available() -> bool:
+    try:
+        _open_socket(socket.AF_INET).close()
+        return True
+    except OSError:
+        return False
+
+
+class IcmpProber:
+    def __init__(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._sockets: Dict[int, socket.socket] = {}
+        self._idents: Dict[int, int] = {}
+        self._seq = 0
+        self._waiters: Dict[Tuple[int, int, int], asyncio.Future] = {}
+
+    def _get_socket(self, family: int) -> socket.socket:
+        sock = self._sockets.get(family)
+        if sock is not None:
+            return sock
+        sock = _open_socket(family)
+        if sock.type == socket.SOCK_DGRAM:
+            sock.bind(("0.0.0.0", 0) if family == socket.AF_INET else ("::", 0))
+            # Ping sockets only report Time Exceeded through the error queue
+            try:
+                if family == socket.AF_INET:
+                    sock.setsockopt(socket.IPPROTO_IP, IP_RECVERR, 1)
+                else:
+                    sock.setsockopt(socket.IPPROTO_IPV6, IPV6_RECVERR, 1)
+            except OSError:
+                pass
+        # Linux rewrites the identifier of ping sockets to the local port
+        port = sock.getsockname()[1] if sock.type == socket.SOCK_DGRAM else 0
+        self._idents[family] = port or (os.getpid() & 0xFFFF)
+        self._sockets[family] = sock
+        self._loop.add_reader(sock.fileno(), self._on_readable, family)
+        return sock
+
+    def _resolve_waiter(
+        self, family: int, ident: int, seq: int, received: float, responder: str, kind: str
+    ) -> None:
+        waiter = self._waiters.pop((family, ident, seq), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result((received, responder, kind))
+
+    def _on_readable(self, family: int) -> None:
+        sock = self._sockets[family]
+        if sock.type == socket.SOCK_DGRAM:
+            self._read_error_queue(family, sock)
+        while True:
+            try:
+                data, sender = sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received = time.perf_counter()
+
+            # Raw IPv4 sockets (and ping sockets on macOS) include the IP header
+            if family == socket.AF_INET and data and data[0] >> 4 == 4:
+                data = data[(data[0] & 0x0F) * 4:]
+            if len(data) < 8:
+                continue
+
+            icmp_type, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+            if family == socket.AF_INET:
+                reply_type, exceeded, unreachable = (
+                    ICMP_ECHO_REPLY, ICMP_TIME_EXCEEDED, ICMP_UNREACHABLE
+                )
+            else:
+                reply_type, exceeded, unreachable = (
+                    ICMP6_ECHO_REPLY, ICMP6_TIME_EXCEEDED, ICMP6_UNREACHABLE
+                )
+            if icmp_type == reply_type:
+                self._resolve_waiter(family, ident, seq, received, sender[0], REPLY)
+                continue
+            if icmp_type not in (exceeded, unreachable):
+                continue
+
+            # Errors quote the header of the packet that caused them; only
+            # raw sockets receive them here
+            quoted = data[8:]
+            if family == socket.AF_INET:
+                if not quoted or quoted[0] >> 4 != 4:
+                    continue
+                quoted = quoted[(quoted[0] & 0x0F) * 4:]
+            else:
+                quoted = quoted[40:]
+            if len(quoted) < 8:
+                continue
+            _, _, _, ident, seq = struct.unpack("!BBHHH", quoted[:8])
+            kind = TTL_EXCEEDED if icmp_type == exceeded else UNREACHABLE
+            self._resolve_waiter(family, ident, seq, received, sender[0], kind)
+
+    def _read_error_queue(self, family: int, sock: socket.socket) -> None:
+        while True:
+            try:
+                data, ancdata, _, _ = sock.recvmsg(2048, 512, MSG_ERRQUEUE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received = time.perf_counter()
+            if len(data) < 8:
+                continue
+            # The queued packet is our own echo request, ident as rewritten
+            _, _, _, ident, seq = struct.unpack("!BBHHH", data[:8])
+            for level, cmsg_type, cmsg_data in ancdata:
+                if cmsg_type not in (IP_RECVERR, IPV6_RECVERR) or len(cmsg_data) < 16:
+                    continue
+                # struct sock_extended_err, followed by the offender's address
+                _, origin, ee_type, _, _, _, _ = struct.unpack("=IBBBBII", cmsg_data[:16])
+                if origin not in (SO_EE_ORIGIN_ICMP, SO_EE_ORIGIN_ICMP6):
+                    continue
+                offender = cmsg_data[16:]
+                if family == socket.AF_INET and len(offender) >= 8:
+                    responder = socket.inet_ntop(socket.AF_INET, offender[4:8])
+                elif family == socket.AF_INET6 and len(offender) >= 24:
+                    responder = socket.inet_ntop(socket.AF_INET6, offender[8:24])
+                else:
+                    continue
+                exceeded = ICMP_TIME_EXCEEDED if family == socket.AF_INET else ICMP6_TIME_EXCEEDED
+                kind = TTL_EXCEEDED if ee_type == exceeded else UNREACHABLE
+                self._resolve_waiter(family, ident, seq, received, responder, kind)
+
+    def _next_seq(self) -> int:
+        self._seq = (self._seq + 1) & 0xFFFF
+        return self._seq
+
+    async def _resolve(self, host: str) -> Tuple[int, str]:
+        infos = await self._loop.getaddrinfo(host, None, type=socket.SOCK_DGRAM)
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0]
+
+    async def probe(
+        self, family: int, address: str, timeout_ms: int, ttl: int = DEFAULT_TTL
+    ) -> Tuple[str | None, str | None, float]:
+        # One echo request with the given TTL (hop limit). Returns (kind,
+        # responder, rtt_ms); kind is None when nothing came back. OSError
+        # is raised when the request cannot be sent.
+        sock = self._get_socket(family)
+        ident = self._idents[family]
+        seq = self._next_seq()
+        echo_type = ICMP_ECHO_REQUEST if family == socket.AF_INET else ICMP6_ECHO_REQUEST
+        payload = struct.pack("!d", time.time()) + b"pingy" * 4
+        header = struct.pack("!BBHHH", echo_type, 0, 0, ident, seq)
+        checksum = _checksum(header + payload)
+        packet = struct.pack("!BBHHH", echo_type, 0, checksum, ident, seq) + payload
+
+        key = (family, ident, seq)
+        waiter = self._loop.create_future()
+        self._waiters[key] = waiter
+        try:
+            # The socket is shared, but nothing else runs between setting
+            # the TTL and sending, so every request carries its own TTL
+            if family == socket.AF_INET:
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+            else:
+                sock.setsockopt(socket.IPPROTO_IPV6, socket.IPV6_UNICAST_HOPS, ttl)
+            sent = time.perf_counter()
+            sock.sendto(packet, (address, 0))
+            received, responder, kind = await asyncio.wait_for(
+                waiter, timeout=timeout_ms / 1000.0
+            )
+        except asyncio.TimeoutError:
+            return None, None, 0.0
+        finally:
+            self._waiters.pop(key, None)
+        return kind, responder, (received - sent) * 1000.0
+
+    async def ping(self, host: str, timeout_ms: int = 2000) -> Tuple[bool, float, str, int]:
+        try:
+            family, address = await self._resolve(host)
+        except socket.gaierror:
+            return False, 0.0, "unknown host", RC_ERROR
+
+        try:
+            kind, _, rtt = await self.probe(family, address, timeout_ms)
+        except OSError as e:
+            return False, 0.0, e.strerror or str(e), RC_ERROR
+        if kind is None:
+            return False, 0.0, "no response", RC_NO_REPLY
+        if kind != REPLY:
+            message = "unreachable" if kind == UNREACHABLE else "TTL exceeded"
+            return False, 0.0, message, RC_NO_REPLY
+        return True, rtt, "", RC_OK
+
+    def close(self) -> None:
+        for sock in self._sockets.values():
+            self._loop.remove_reader(sock.fileno())
+            sock.close()
+        self._sockets.clear()
+        for waiter in self._waiters.values():
+            waiter.cancel()
+        self._waiters.clear()
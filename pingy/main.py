@@ -1,13 +1,29 @@
 import argparse
+import asyncio
+import ipaddress
+import itertools
 import platform
+import random
 import re
+import sqlite3
 import subprocess
 import sys
-from typing import Iterable, List, Tuple
+import time
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Tuple
 import urllib.error
 import urllib.parse
 import urllib.request
 
+from history import HistoryStore
+from http_probe import HttpChecker, HttpTiming, build_http_url
+from icmp import IcmpProber, native_icmp_available
+from output import FORMATS, ResultWriter, open_writer
+from probes import tcp_probe
+from resolver import DEFAULT_TTL, Resolution, Resolver
+from stats import DEFAULT_WINDOW, AdaptiveTimeouts, RttStats
+from pathtrace import DEFAULT_TRACE_ROUNDS, MAX_HOPS, Hop, trace_path
+
 
 RESET = "\033[0m"
 GREEN = "\033[92m"
@@ -16,6 +32,126 @@ CYAN = "\033[96m"
 YELLOW = "\033[93m"
 DIM = "\033[2m"
 
+DEFAULT_CONCURRENCY = 50
+DEFAULT_REPORT_DAYS = 7
+WORST_HOSTS_LIMIT = 10
+# Adaptive timeouts may grow up to this multiple of --timeout
+MAX_TIMEOUT_FACTOR = 4
+RETRY_BACKOFF_MS = 100
+# Hosts with some (but not total) loss are probed this many times as often
+FLAKY_SPEEDUP = 4
+DEFAULT_PACE_MS = 200
+# A --count burst is DOWN when more than this percentage of probes is lost
+DEFAULT_MAX_LOSS = 50.0
+# Used for address ranges when probes are cheap sockets; stays below the
+# usual limit of 1024 open files
+SWEEP_CONCURRENCY = 512
+
+PingFunc = Callable[[str, int], Awaitable[Tuple[bool, float, str, int]]]
+
+
+@dataclass
+class CheckResult:
+    host: str
+    ok: bool
+    latency: float
+    message: str
+    ping_code: int
+    http_status: int | None = None
+    kind: str = "icmp"
+    connect_ms: float | None = None
+    tls_ms: float | None = None
+    http: HttpTiming | None = None
+    address: str | None = None
+    dns_ms: float | None = None
+    dns_cached: bool = False
+    attempts: int = 1
+    burst: Dict[str, float] | None = None
+
+
+def parse_target(target: str) -> Tuple[str, str, int | None]:
+    # "tcp:host:port", "tls:host[:port]" or a plain host for ICMP;
+    # IPv6 literals go in brackets: "tcp:[::1]:22"
+    kind, sep, rest = target.partition(":")
+    if not sep or kind not in ("tcp", "tls"):
+        return "icmp", target, None
+    if rest.startswith("["):
+        host, _, port_text = rest[1:].partition("]")
+        port_text = port_text.lstrip(":")
+    else:
+        host, _, port_text = rest.rpartition(":") if ":" in rest else (rest, "", "")
+    if not port_text:
+        if kind == "tcp":
+            raise ValueError(f"TCP target needs a port: {target}")
+        port_text = "443"
+    if not port_text.isdigit() or not 0 < int(port_text) < 65536:
+        raise ValueError(f"Invalid port in target: {target}")
+    return kind, host, int(port_text)
+
+
+def _expand_host(host: str) -> Iterator[str] | None:
+    # "10.0.0.0/22", "192.168.1.10-200" or "10.0.0.1-10.0.1.255"; None for a
+    # single host. Addresses are generated lazily, so a /16 is never a list.
+    if "/" in host:
+        address_text = host.partition("/")[0]
+        try:
+            ipaddress.ip_address(address_text)
+        except ValueError:
+            return None
+        try:
+            network = ipaddress.ip_network(host, strict=False)
+        except ValueError:
+            raise ValueError(f"Invalid network: {host}") from None
+        return (str(address) for address in network.hosts())
+
+    start_text, sep, end_text = host.rpartition("-")
+    if not sep:
+        return None
+    try:
+        start = ipaddress.ip_address(start_text)
+    except ValueError:
+        return None
+    try:
+        if end_text.isdigit() and start.version == 4:
+            end = ipaddress.ip_address(start_text.rsplit(".", 1)[0] + "." + end_text)
+        else:
+            end = ipaddress.ip_address(end_text)
+    except ValueError:
+        raise ValueError(f"Invalid address range: {host}") from None
+    if end.version != start.version or end < start:
+        raise ValueError(f"Invalid address range: {host}")
+    return (str(start + offset) for offset in range(int(end) - int(start) + 1))
+
+
+def is_range(target: str) -> bool:
+    return _expand_host(parse_target(target)[1]) is not None
+
+
+def expand_targets(targets: Iterable[str]) -> Iterator[str]:
+    for target in targets:
+        kind, host, port = parse_target(target)
+        addresses = _expand_host(host)
+        if addresses is None:
+            yield target
+        elif kind == "icmp":
+            yield from addresses
+        else:
+            for address in addresses:
+                host_text = f"[{address}]" if ":" in address else address
+                yield f"{kind}:{host_text}:{port}"
+
+
+def target_name(target: str) -> str:
+    # The host name a target needs resolved, without scheme, port or path
+    kind, name, _ = parse_target(target)
+    if kind != "icmp":
+        return name
+    try:
+        return str(ipaddress.ip_address(name))
+    except ValueError:
+        pass
+    return urllib.parse.urlparse(build_http_url(name)).hostname or name
+
 
 def _build_ping_command(host: str, timeout_ms: int) -> List[str]:
     system = platform.system().lower()
@@ -45,18 +181,9 @@ def _extract_latency(output: str) -> Tuple[bool, float]:
     return False, 0.0
 
 
-def ping_host(host: str, timeout_ms: int = 2000) -> Tuple[bool, float, str, int]:
-    cmd = _build_ping_command(host, timeout_ms)
-    try:
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=False,
-        )
-    except FileNotFoundError:
-        return False, 0.0, "ping command not found", -1
-    raw_out = proc.stdout or b""
-    raw_err = proc.stderr or b""
+def _parse_ping_output(
+    raw_out: bytes, raw_err: bytes, returncode: int
+) -> Tuple[bool, float, str, int]:
     decoded_out = ""
     decoded_err = ""
     for enc in ("cp866", "cp1251", "utf-8"):
@@ -71,26 +198,54 @@ def ping_host(host: str, timeout_ms: int = 2000) -> Tuple[bool, float, str, int]
             except Exception:
                 decoded_err = ""
     output = decoded_out + decoded_err
-    ok = proc.returncode == 0
+    ok = returncode == 0
     has_latency, latency = _extract_latency(output)
     if not has_latency:
         latency = 0.0
     if not ok and not output.strip():
-        return False, latency, "no response", proc.returncode
+        return False, latency, "no response", returncode
     if not ok:
-        return False, latency, "unreachable", proc.returncode
-    return True, latency, "", proc.returncode
+        return False, latency, "unreachable", returncode
+    return True, latency, "", returncode
 
 
-def _build_http_url(host: str) -> str:
-    parsed = urllib.parse.urlparse(host)
-    if not parsed.scheme:
-        return f"http://{host}"
-    return host
+def ping_host(host: str, timeout_ms: int = 2000) -> Tuple[bool, float, str, int]:
+    cmd = _build_ping_command(host, timeout_ms)
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=False,
+        )
+    except FileNotFoundError:
+        return False, 0.0, "ping command not found", -1
+    return _parse_ping_output(proc.stdout or b"", proc.stderr or b"", proc.returncode)
+
+
+async def ping_host_async(host: str, timeout_ms: int = 2000) -> Tuple[bool, float, str, int]:
+    cmd = _build_ping_command(host, timeout_ms)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        return False, 0.0, "ping command not found", -1
+    # ping enforces its own timeout; the extra second only guards against hangs
+    try:
+        raw_out, raw_err = await asyncio.wait_for(
+            proc.communicate(), timeout=timeout_ms / 1000.0 + 1.0
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return False, 0.0, "no response", -1
+    return _parse_ping_output(raw_out or b"", raw_err or b"", proc.returncode)
 
 
 def get_http_status(host: str, timeout_ms: int) -> Tuple[bool, int, str]:
-    url = _build_http_url(host)
+    url = build_http_url(host)
     timeout_s = max(1.0, timeout_ms / 1000.0)
     try:
         with urllib.request.urlopen(url, timeout=timeout_s) as resp:
@@ -104,38 +259,482 @@ def get_http_status(host: str, timeout_ms: int) -> Tuple[bool, int, str]:
         return False, 0, str(e)
 
 
-def _format_single_result(
-    host: str,
-    ok: bool,
-    latency: float,
-    message: str,
-    ping_code: int,
-    http_status: int | None,
-) -> str:
-    status_color = GREEN if ok else RED
-    status_text = "UP" if ok else "DOWN"
-    latency_text = f"{latency:.1f} ms" if latency > 0 else "-"
-    host_field = f"{host:<30}"
-    status_field = f"{status_text:^10}"
+def _dns_details(result: CheckResult) -> List[str]:
+    if result.dns_cached:
+        return ["dns cached"]
+    if result.dns_ms is not None and result.dns_ms > 0:
+        return [f"dns {result.dns_ms:.1f} ms"]
+    return []
+
+
+def _burst_details(result: CheckResult) -> List[str]:
+    summary = result.burst
+    if summary is None:
+        return []
+    loss = f"loss {summary['loss']:.0f}% ({summary['received']}/{summary['sent']})"
+    if not summary["received"]:
+        return [loss]
+    return [
+        loss,
+        f"rtt {summary['min']:.1f}/{summary['avg']:.1f}/{summary['max']:.1f} ms min/avg/max",
+        f"p95 {summary['p95']:.1f} ms",
+        f"jitter {summary['ipdv']:.1f} ms",
+    ]
+
+
+def _result_details(result: CheckResult) -> List[str]:
     parts = []
-    if ok:
+    if result.kind in ("tcp", "tls"):
+        if result.connect_ms is not None and result.connect_ms > 0:
+            parts.append(f"connect {result.connect_ms:.1f} ms")
+        if result.tls_ms is not None:
+            parts.append(f"tls {result.tls_ms:.1f} ms")
+        if not result.ok:
+            parts.append(result.message or "no reply")
+        parts.extend(_burst_details(result))
+        if result.attempts > 1:
+            parts.append(f"{result.attempts} attempts")
+        return parts + _dns_details(result)
+
+    latency_text = f"{result.latency:.1f} ms" if result.latency > 0 else "-"
+    if result.ok:
         parts.append(f"latency {latency_text}")
     else:
-        parts.append(message or "no reply")
+        parts.append(result.message or "no reply")
 
-    parts.append(f"ping_rc {ping_code}")
+    parts.extend(_burst_details(result))
+    parts.append(f"ping_rc {result.ping_code}")
+    if result.attempts > 1:
+        parts.append(f"{result.attempts} attempts")
 
-    if http_status is not None and http_status != 0:
-        parts.append(f"http {http_status}")
+    if result.http_status is not None and result.http_status != 0:
+        parts.append(f"http {result.http_status}")
+    if result.http is not None and result.http.total_ms is not None:
+        timing = result.http
+        phases = [
+            ("dns", timing.dns_ms),
+            ("connect", timing.connect_ms),
+            ("tls", timing.tls_ms),
+            ("ttfb", timing.ttfb_ms),
+            ("total", timing.total_ms),
+        ]
+        breakdown = " ".join(f"{name} {value:.1f}" for name, value in phases if value is not None)
+        reuse = " reused" if timing.reused else ""
+        parts.append(f"{timing.method}{reuse} {breakdown} ms")
+    return parts + _dns_details(result)
 
+
+async def _burst(
+    probe: Callable[[], Awaitable[float | None]], count: int, pace_ms: int
+) -> RttStats:
+    # Probes start pace_ms apart without waiting for earlier replies, so a
+    # burst takes about count * pace_ms plus one timeout
+    tasks = []
+    try:
+        for i in range(count):
+            if i:
+                await asyncio.sleep(pace_ms / 1000.0)
+            tasks.append(asyncio.ensure_future(probe()))
+        rtts = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+    stats = RttStats(count)
+    for rtt in rtts:
+        stats.add(rtt)
+    return stats
+
+
+def _format_box(rows: List[Tuple[str, str]]) -> str:
+    # rows are (plain, colored) pairs; the plain text gives the width
+    width = max(len(plain) for plain, _ in rows)
+    border = "─" * (width + 1)
+    lines = [f"│{colored}{' ' * (width - len(plain))} │" for plain, colored in rows]
+    return "\n".join([f"┌{border}┐", *lines, f"└{border}┘"])
+
+
+def _result_row(host: str, ok: bool, parts: List[str]) -> Tuple[str, str]:
+    status_color = GREEN if ok else RED
+    status_text = "UP" if ok else "DOWN"
+    host_field = f"{host:<30}"
+    status_field = f"{status_text:^10}"
     detail_plain = ", ".join(parts)
     line_plain = f" {host_field} {status_field} {detail_plain}"
     host_colored = f"{CYAN}{host_field}{RESET}"
     status_colored = f"{status_color}{status_field}{RESET}"
     detail_colored = f"{DIM}{detail_plain}{RESET}"
     line_colored = f" {host_colored} {status_colored} {detail_colored}"
-    border = "─" * (len(line_plain) + 1)
-    return f"┌{border}┐\n│{line_colored} │\n└{border}┘"
+    return line_plain, line_colored
+
+
+def _format_single_result(host: str, ok: bool, parts: List[str]) -> str:
+    return _format_box([_result_row(host, ok, parts)])
+
+
+def _format_trace_result(
+    host: str, address: str | None, hops: List[Hop], reached: bool, message: str = ""
+) -> str:
+    if address is None:
+        return _format_single_result(host, False, [message or "unknown host"])
+    parts = [address, f"{len(hops)} hop" + ("s" if len(hops) != 1 else "")]
+    if not reached:
+        if not message and hops and hops[-1].unreachable:
+            message = f"unreachable at hop {hops[-1].ttl}"
+        parts.append(message or "destination not reached")
+    rows = [_result_row(host, reached, parts)]
+    header = (
+        f"   {'hop':>3}  {'address':<39} {'loss':>6} {'sent':>5} {'last':>7} "
+        f"{'avg':>7} {'best':>7} {'worst':>7} {'jitter':>7}"
+    )
+    rows.append((header, f"{DIM}{header}{RESET}"))
+    for hop in hops:
+        summary = hop.stats.summary()
+        addresses = hop.addresses or ["???"]
+        last = f"{hop.stats.last_rtt:.1f}" if hop.stats.last_rtt is not None else "-"
+        loss_color = GREEN if summary["loss"] == 0 else YELLOW if summary["loss"] < 50 else RED
+        received = summary["received"] > 0
+        timing = (
+            f"{last:>7} {summary['avg']:>7.1f} {summary['min']:>7.1f} "
+            f"{summary['max']:>7.1f} {summary['ipdv']:>7.1f}"
+            if received else f"{'-':>7} {'-':>7} {'-':>7} {'-':>7} {'-':>7}"
+        )
+        mark = " !" if hop.unreachable else ""
+        loss_text = f"{summary['loss']:>5.1f}%"
+        plain = (
+            f"   {hop.ttl:>3}. {addresses[0] + mark:<39} {loss_text} "
+            f"{summary['sent']:>5} {timing}"
+        )
+        colored = (
+            f"   {hop.ttl:>3}. {CYAN}{addresses[0] + mark:<39}{RESET} "
+            f"{loss_color}{loss_text}{RESET} {summary['sent']:>5} {timing}"
+        )
+        rows.append((plain, colored))
+        # Further addresses of a load-balanced hop get their own lines
+        for extra in addresses[1:]:
+            line = f"         {extra:<39}"
+            rows.append((line, f"         {CYAN}{extra:<39}{RESET}"))
+    return _format_box(rows)
+
+
+async def _check_burst(
+    host: str,
+    timeout_ms: int,
+    check_http: bool,
+    ping: PingFunc,
+    http: HttpChecker | None,
+    address: str | None,
+    count: int,
+    pace_ms: int,
+    max_loss: float,
+) -> CheckResult:
+    kind, name, port = parse_target(host)
+    errors: List[str] = []
+
+    async def probe() -> float | None:
+        if kind in ("tcp", "tls"):
+            ok, rtt, _, msg = await tcp_probe(
+                name, port, timeout_ms, tls=kind == "tls", address=address
+            )
+        else:
+            ok, rtt, msg, _ = await ping(address or host, timeout_ms)
+        if not ok:
+            errors.append(msg)
+            return None
+        return rtt
+
+    timing = None
+    if check_http and kind == "icmp":
+        if http is None:
+            http = HttpChecker(timeout_ms)
+        stats, timing = await asyncio.gather(
+            _burst(probe, count, pace_ms),
+            http.check(host, address),
+        )
+    else:
+        stats = await _burst(probe, count, pace_ms)
+
+    summary = stats.summary()
+    ok = stats.received > 0 and summary["loss"] <= max_loss
+    if ok:
+        msg = ""
+    elif stats.received:
+        msg = f"loss above {max_loss:g}%"
+    else:
+        msg = errors[0] if errors else "no reply"
+    if not ok and timing is not None and timing.ok:
+        ok = True
+        msg = timing.message
+    ping_code = -1 if kind != "icmp" else 0 if stats.received else 1
+    return CheckResult(
+        host, ok, summary["avg"], msg, ping_code,
+        http_status=timing.status if timing else None, kind=kind, http=timing, burst=summary,
+    )
+
+
+async def check_host(
+    host: str,
+    timeout_ms: int,
+    check_http: bool,
+    ping: PingFunc = ping_host_async,
+    http: HttpChecker | None = None,
+    resolution: Resolution | None = None,
+    count: int = 1,
+    pace_ms: int = DEFAULT_PACE_MS,
+    max_loss: float = DEFAULT_MAX_LOSS,
+) -> CheckResult:
+    # Without a resolution every probe looks the name up on its own
+    kind, name, port = parse_target(host)
+    address = resolution.address if resolution else None
+    if resolution is not None and not resolution.ok:
+        result = CheckResult(host, False, 0.0, resolution.message, -1, kind=kind)
+    elif count > 1:
+        result = await _check_burst(
+            host, timeout_ms, check_http, ping, http, address,
+            count, pace_ms, max_loss,
+        )
+    elif kind in ("tcp", "tls"):
+        ok, connect_ms, tls_ms, msg = await tcp_probe(
+            name, port, timeout_ms, tls=kind == "tls", address=address
+        )
+        result = CheckResult(
+            host, ok, connect_ms or 0.0, msg, -1,
+            kind=kind, connect_ms=connect_ms, tls_ms=tls_ms,
+        )
+    elif check_http:
+        if http is None:
+            http = HttpChecker(timeout_ms)
+        (ok, latency, msg, ping_code), timing = await asyncio.gather(
+            ping(address or host, timeout_ms),
+            http.check(host, address),
+        )
+        if not ok and timing.ok:
+            ok = True
+            msg = timing.message
+        result = CheckResult(host, ok, latency, msg, ping_code, timing.status, http=timing)
+    else:
+        ok, latency, msg, ping_code = await ping(address or host, timeout_ms)
+        result = CheckResult(host, ok, latency, msg, ping_code)
+
+    if resolution is not None:
+        result.address = address
+        result.dns_ms = resolution.dns_ms
+        result.dns_cached = resolution.cached
+    return result
+
+
+def _default_concurrency(targets: List[str], prober: str) -> int:
+    kinds = {parse_target(target)[0] for target in targets if is_range(target)}
+    if not kinds:
+        return DEFAULT_CONCURRENCY
+    # Hundreds of ping processes at once would swamp the machine
+    if "icmp" in kinds and (prober == "subprocess" or not native_icmp_available()):
+        return DEFAULT_CONCURRENCY
+    return SWEEP_CONCURRENCY
+
+
+def _adaptive_needs_sockets(targets: List[str], prober: str) -> bool:
+    # ping -W takes whole seconds outside Windows, so adaptive timeouts
+    # below 1 s only take effect with ICMP sockets
+    if platform.system().lower() == "windows":
+        return False
+    if not any(parse_target(target.strip())[0] == "icmp" for target in targets):
+        return False
+    return prober == "subprocess" or not native_icmp_available()
+
+
+def _use_native_icmp(prober: str) -> bool:
+    if prober == "subprocess":
+        return False
+    available = native_icmp_available()
+    if prober == "native" and not available:
+        print(
+            f"{YELLOW}ICMP sockets are not permitted, falling back to the ping command{RESET}",
+            file=sys.stderr,
+        )
+    return available
+
+
+async def check_hosts(
+    hosts: List[str],
+    timeout_ms: int = 2000,
+    check_http: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    ordered: bool = False,
+    prober: str = "auto",
+    ping: PingFunc | None = None,
+    http: HttpChecker | None = None,
+    resolver: Resolver | None = None,
+    retries: int = 0,
+    timeouts: AdaptiveTimeouts | None = None,
+    count: int = 1,
+    pace_ms: int = DEFAULT_PACE_MS,
+    max_loss: float = DEFAULT_MAX_LOSS,
+) -> AsyncIterator[CheckResult]:
+    # hosts may be a lazy generator (an expanded address range); it is only
+    # consumed as fast as the probes finish
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    icmp = None
+    if ping is None:
+        icmp = IcmpProber() if _use_native_icmp(prober) else None
+        ping = icmp.ping if icmp else ping_host_async
+    own_http = http is None and check_http
+    if own_http:
+        http = HttpChecker(timeout_ms)
+
+    if resolver is None:
+        resolver = Resolver(timeout_ms)
+
+    async def run(index: int, host: str) -> Tuple[int, CheckResult]:
+        # Names are resolved before taking a probe slot, so lookups for the
+        # hosts queued behind the running probes happen in parallel with them
+        resolution = await resolver.resolve(target_name(host))
+        for attempt in range(retries + 1):
+            host_timeout = timeouts.timeout_ms(host) if timeouts else timeout_ms
+            async with semaphore:
+                result = await check_host(
+                    host, host_timeout, check_http, ping, http, resolution,
+                    count, pace_ms, max_loss,
+                )
+            if timeouts is not None and (result.latency > 0 or not result.ok):
+                timeouts.observe(host, result.latency if result.ok else None)
+            # A failed lookup will not change on retry
+            if result.ok or not resolution.ok or attempt == retries:
+                break
+            # Exponential backoff with jitter, outside the probe slot
+            delay_ms = RETRY_BACKOFF_MS * 2 ** attempt * (1.0 + random.random())
+            await asyncio.sleep(delay_ms / 1000.0)
+        result.attempts = attempt + 1
+        return index, result
+
+    targets = enumerate(hosts)
+    window = max(1, concurrency) * 2
+    running: set[asyncio.Future] = set()
+    finished: asyncio.Queue = asyncio.Queue()
+
+    def on_done(task: asyncio.Future) -> None:
+        running.discard(task)
+        if not task.cancelled():
+            finished.put_nowait(task)
+
+    def refill() -> None:
+        for index, host in itertools.islice(targets, window - len(running)):
+            task = asyncio.ensure_future(run(index, host))
+            running.add(task)
+            task.add_done_callback(on_done)
+
+    pending: dict[int, CheckResult] = {}
+    next_index = 0
+    try:
+        refill()
+        while running or not finished.empty():
+            task = await finished.get()
+            refill()
+            index, result = task.result()
+            if not ordered:
+                yield result
+                continue
+            # Hold early finishers back until every host before them is done
+            pending[index] = result
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        for task in list(running):
+            task.cancel()
+        if icmp:
+            icmp.close()
+        if own_http:
+            http.close()
+
+
+def _ms(value: float | None) -> float | None:
+    return round(value, 3) if value is not None else None
+
+
+def result_record(result: CheckResult) -> dict:
+    # One flat record per result, shared by all --format writers
+    timing = result.http
+    burst = result.burst
+    return {
+        "timestamp": round(time.time(), 3),
+        "host": result.host,
+        "kind": result.kind,
+        "ok": result.ok,
+        "latency_ms": _ms(result.latency) if result.ok and result.latency > 0 else None,
+        "message": result.message,
+        "ping_rc": result.ping_code if result.kind == "icmp" else None,
+        "address": result.address,
+        "dns_ms": _ms(result.dns_ms) if result.dns_ms else None,
+        "dns_cached": result.dns_cached,
+        "connect_ms": _ms(result.connect_ms if timing is None else timing.connect_ms),
+        "tls_ms": _ms(result.tls_ms if timing is None else timing.tls_ms),
+        "http_status": result.http_status or None,
+        "http_method": timing.method if timing else None,
+        "http_ttfb_ms": _ms(timing.ttfb_ms) if timing else None,
+        "http_total_ms": _ms(timing.total_ms) if timing else None,
+        "http_reused": timing.reused if timing else None,
+        "attempts": result.attempts,
+        "sent": burst["sent"] if burst else None,
+        "received": burst["received"] if burst else None,
+        "loss_pct": _ms(burst["loss"]) if burst else None,
+        "rtt_min_ms": _ms(burst["min"]) if burst else None,
+        "rtt_p50_ms": _ms(burst["p50"]) if burst else None,
+        "rtt_p95_ms": _ms(burst["p95"]) if burst else None,
+        "rtt_max_ms": _ms(burst["max"]) if burst else None,
+        "jitter_ms": _ms(burst["ipdv"]) if burst else None,
+        "details": ", ".join(_result_details(result)),
+    }
+
+
+def _open_writer(output_format: str, output_path: str | None) -> ResultWriter | None:
+    try:
+        return open_writer(output_format, output_path)
+    except OSError:
+        print(f"{RED}Cannot write results file: {output_path}{RESET}", file=sys.stderr)
+        return None
+
+
+def _open_history(history_path: str | None) -> HistoryStore | None:
+    if not history_path:
+        return None
+    try:
+        return HistoryStore(history_path)
+    except sqlite3.Error as e:
+        print(f"{RED}Cannot open history database {history_path}: {e}{RESET}", file=sys.stderr)
+        return None
+
+
+def _open_writers(
+    output_format: str, output_path: str | None, history_path: str | None
+) -> List[ResultWriter | HistoryStore]:
+    writers = [_open_writer(output_format, output_path), _open_history(history_path)]
+    return [writer for writer in writers if writer is not None]
+
+
+async def _report_results(
+    results: AsyncIterator[CheckResult],
+    writers: List[ResultWriter | HistoryStore],
+    console: bool,
+) -> Tuple[int, int]:
+    up_count = 0
+    down_count = 0
+
+    async for result in results:
+        if console:
+            parts = _result_details(result)
+            print(_format_single_result(result.host, result.ok, parts), flush=True)
+
+        if result.ok:
+            up_count += 1
+        else:
+            down_count += 1
+
+        if writers:
+            record = result_record(result)
+            for writer in writers:
+                writer.write(record)
+
+    return up_count, down_count
 
 
 def ping_hosts(
@@ -143,89 +742,396 @@ def ping_hosts(
     timeout_ms: int = 2000,
     output_path: str | None = None,
     check_http: bool = False,
+    concurrency: int | None = None,
+    ordered: bool = False,
+    prober: str = "auto",
+    output_format: str = "text",
+    history_path: str | None = None,
+    retries: int = 0,
+    adaptive: bool = False,
+    count: int = 1,
+    pace_ms: int = DEFAULT_PACE_MS,
+    max_loss: float = DEFAULT_MAX_LOSS,
 ) -> None:
-    cleaned_hosts = [h.strip() for h in hosts if h and h.strip()]
+    # Host files often list a target twice; check it once
+    cleaned_hosts = list(dict.fromkeys(h.strip() for h in hosts if h and h.strip()))
     if not cleaned_hosts:
-        print(f"{YELLOW}No hosts provided{RESET}")
+        print(f"{YELLOW}No hosts provided{RESET}", file=sys.stderr)
         return
+    if concurrency is None:
+        concurrency = _default_concurrency(cleaned_hosts, prober)
 
-    print(f"{CYAN}Pingy host availability check{RESET}")
-    print(f"{DIM}{'=' * 40}{RESET}")
+    # Machine-readable output without -o takes over stdout
+    console = output_format == "text" or output_path is not None
+    writers = _open_writers(output_format, output_path, history_path)
+    timeouts = _adaptive_timeouts(timeout_ms) if adaptive else None
 
-    up_count = 0
-    down_count = 0
-    file_lines: List[str] = []
-
-    if output_path:
-        file_lines.append("Pingy host availability check")
-        file_lines.append("=" * 40)
-
-    for host in cleaned_hosts:
-        ok, latency, msg, ping_code = ping_host(host, timeout_ms=timeout_ms)
-
-        http_status: int | None = None
-        http_ok = False
-        http_msg = ""
-        if check_http:
-            http_ok, http_status, http_msg = get_http_status(host, timeout_ms)
-            if not ok and http_ok:
-                ok = True
-                msg = http_msg
-
-        formatted = _format_single_result(
-            host,
-            ok,
-            latency,
-            msg,
-            ping_code,
-            http_status,
+    if console:
+        print(f"{CYAN}Pingy host availability check{RESET}")
+        print(f"{DIM}{'=' * 40}{RESET}")
+
+    try:
+        up_count, down_count = asyncio.run(
+            _report_results(
+                check_hosts(
+                    expand_targets(cleaned_hosts), timeout_ms, check_http,
+                    concurrency, ordered, prober,
+                    retries=retries, timeouts=timeouts,
+                    count=count, pace_ms=pace_ms, max_loss=max_loss,
+                ),
+                writers,
+                console,
+            )
         )
-        print(formatted)
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    for writer in writers:
+        writer.close(up_count, down_count)
+
+    if console:
+        total = up_count + down_count
+        print(f"{DIM}{'-' * 40}{RESET}")
+        print(
+            f"{GREEN}UP: {up_count}{RESET}, "
+            f"{RED}DOWN: {down_count}{RESET}, "
+            f"{CYAN}TOTAL: {total}{RESET}"
+        )
+
+
+def _adaptive_timeouts(timeout_ms: int) -> AdaptiveTimeouts:
+    # --timeout is where every host starts; hosts that turn out to be slow
+    # may earn up to MAX_TIMEOUT_FACTOR times as much
+    return AdaptiveTimeouts(timeout_ms, timeout_ms * MAX_TIMEOUT_FACTOR)
 
-        if ok:
-            up_count += 1
-        else:
-            down_count += 1
 
-        if output_path:
-            status_text = "UP" if ok else "DOWN"
-            latency_text = f"{latency:.1f} ms" if latency > 0 else "-"
+def _probe_interval(host_stats: RttStats, interval_s: float, adaptive: bool) -> float:
+    if not adaptive:
+        return interval_s
+    loss = host_stats.summary()["loss"]
+    # Hosts that are down for good get no extra probes, only the flaky ones
+    if 0.0 < loss < 100.0:
+        return interval_s / FLAKY_SPEEDUP
+    return interval_s
 
-            parts = []
-            if ok:
-                parts.append(f"latency {latency_text}")
+
+def _publish_prom(records: Iterable[dict], output_path: str | None) -> None:
+    writer = _open_writer("prom", output_path)
+    if writer is None:
+        return
+    up_count = down_count = 0
+    try:
+        for record in records:
+            writer.write(record)
+            if record["ok"]:
+                up_count += 1
             else:
-                parts.append(msg or "no reply")
-            parts.append(f"ping_rc {ping_code}")
-            if http_status is not None and http_status != 0:
-                parts.append(f"http {http_status}")
-
-            detail_plain = ", ".join(parts)
-            file_lines.append(
-                f"{host};{status_text};{latency_text};{detail_plain}"
-            )
+                down_count += 1
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close(up_count, down_count)
 
-    total = len(cleaned_hosts)
-    print(f"{DIM}{'-' * 40}{RESET}")
-    print(
-        f"{GREEN}UP: {up_count}{RESET}, "
-        f"{RED}DOWN: {down_count}{RESET}, "
-        f"{CYAN}TOTAL: {total}{RESET}"
-    )
 
-    if output_path:
-        file_lines.append("")
-        file_lines.append(f"UP: {up_count}, DOWN: {down_count}, TOTAL: {total}")
+def _format_watch_table(hosts: List[str], stats: dict[str, RttStats], rounds: int) -> str:
+    lines = [
+        f"{CYAN}Pingy watch{RESET} {DIM}round {rounds}, Ctrl+C to stop{RESET}",
+        f"{DIM}{'host':<30} {'status':^6} {'last':>7} {'min':>7} {'avg':>7} {'max':>7} "
+        f"{'p50':>7} {'p95':>7} {'p99':>7} {'jitter':>7} {'loss':>6}{RESET}",
+    ]
+    for host in hosts:
+        host_stats = stats[host]
+        summary = host_stats.summary()
+        up = host_stats.last_rtt is not None
+        status = f"{GREEN}{'UP':^6}{RESET}" if up else f"{RED}{'DOWN':^6}{RESET}"
+        last = f"{host_stats.last_rtt:.1f}" if up else "-"
+        loss_color = GREEN if summary["loss"] == 0 else YELLOW if summary["loss"] < 50 else RED
+        lines.append(
+            f"{CYAN}{host:<30}{RESET} {status} {last:>7} "
+            f"{summary['min']:>7.1f} {summary['avg']:>7.1f} {summary['max']:>7.1f} "
+            f"{summary['p50']:>7.1f} {summary['p95']:>7.1f} {summary['p99']:>7.1f} "
+            f"{summary['jitter']:>7.1f} {loss_color}{summary['loss']:>5.1f}%{RESET}"
+        )
+    return "\n".join(lines)
+
+
+async def _watch(
+    hosts: List[str],
+    stats: dict[str, RttStats],
+    interval_s: float,
+    timeout_ms: int,
+    check_http: bool,
+    concurrency: int,
+    prober: str,
+    dns_ttl: float,
+    output_format: str,
+    output_path: str | None,
+    history_path: str | None,
+    retries: int,
+    adaptive: bool,
+    count: int,
+    pace_ms: int,
+    max_loss: float,
+) -> None:
+    icmp = IcmpProber() if _use_native_icmp(prober) else None
+    ping = icmp.ping if icmp else ping_host_async
+    # Shared across rounds so keep-alive connections and cached
+    # DNS answers are reused
+    http = HttpChecker(timeout_ms) if check_http else None
+    resolver = Resolver(timeout_ms, dns_ttl)
+    timeouts = _adaptive_timeouts(timeout_ms) if adaptive else None
+    console = output_format == "text" or output_path is not None
+    # JSONL, CSV and the history store take every probe of the session;
+    # a Prometheus textfile is republished after each round instead
+    if output_format in ("jsonl", "csv"):
+        writers = _open_writers(output_format, output_path, history_path)
+    else:
+        writers = _open_writers("text", None, history_path)
+    # Each host has its own due time, so flaky hosts can be probed more
+    # often; a round checks only the hosts that are due
+    next_due = dict.fromkeys(hosts, 0.0)
+    latest: dict[str, dict] = {}
+    rounds = 0
+    try:
+        while True:
+            started = time.monotonic()
+            due = [host for host in hosts if next_due[host] <= started]
+            async for result in check_hosts(
+                due, timeout_ms, check_http, concurrency,
+                ping=ping, http=http, resolver=resolver,
+                retries=retries, timeouts=timeouts,
+                count=count, pace_ms=pace_ms, max_loss=max_loss,
+            ):
+                host_stats = stats[result.host]
+                host_stats.add(result.latency if result.ok else None)
+                next_due[result.host] = started + _probe_interval(host_stats, interval_s, adaptive)
+                if writers or output_format == "prom":
+                    record = result_record(result)
+                    for writer in writers:
+                        writer.write(record)
+                    latest[result.host] = record
+            # A watch usually ends with a signal, so nothing is left buffered
+            # between rounds
+            for writer in writers:
+                writer.flush()
+            if output_format == "prom":
+                _publish_prom(latest.values(), output_path)
+            rounds += 1
+            if console:
+                # Cursor home + clear screen redraws the table in place
+                print("\033[H\033[J" + _format_watch_table(hosts, stats, rounds), flush=True)
+            await asyncio.sleep(max(0.0, min(next_due.values()) - time.monotonic()))
+    finally:
+        if icmp:
+            icmp.close()
+        if http:
+            http.close()
+        for writer in writers:
+            writer.abort()
+
+
+def watch_hosts(
+    hosts: Iterable[str],
+    interval_s: float = 1.0,
+    timeout_ms: int = 2000,
+    output_path: str | None = None,
+    check_http: bool = False,
+    concurrency: int | None = None,
+    prober: str = "auto",
+    window: int = DEFAULT_WINDOW,
+    dns_ttl: float = DEFAULT_TTL,
+    output_format: str = "text",
+    history_path: str | None = None,
+    retries: int = 0,
+    adaptive: bool = False,
+    count: int = 1,
+    pace_ms: int = DEFAULT_PACE_MS,
+    max_loss: float = DEFAULT_MAX_LOSS,
+) -> None:
+    patterns = [h.strip() for h in hosts if h and h.strip()]
+    cleaned_hosts = list(dict.fromkeys(expand_targets(patterns)))
+    if not cleaned_hosts:
+        print(f"{YELLOW}No hosts provided{RESET}", file=sys.stderr)
+        return
+    if concurrency is None:
+        concurrency = _default_concurrency(patterns, prober)
+
+    stats = {host: RttStats(window) for host in cleaned_hosts}
+    try:
+        asyncio.run(
+            _watch(
+                cleaned_hosts, stats, interval_s, timeout_ms,
+                check_http, concurrency, prober, dns_ttl,
+                output_format, output_path, history_path,
+                retries, adaptive, count, pace_ms, max_loss,
+            )
+        )
+    except KeyboardInterrupt:
+        if output_format == "text" or output_path is not None:
+            print()
+
+    if output_path and output_format == "text":
+        lines = ["host;sent;loss;min;avg;max;p50;p95;p99;jitter"]
+        for host in cleaned_hosts:
+            summary = stats[host].summary()
+            lines.append(
+                f"{host};{summary['sent']};{summary['loss']:.1f};{summary['min']:.1f};"
+                f"{summary['avg']:.1f};{summary['max']:.1f};{summary['p50']:.1f};"
+                f"{summary['p95']:.1f};{summary['p99']:.1f};{summary['jitter']:.1f}"
+            )
         try:
             with open(output_path, "w", encoding="utf-8") as f:
-                f.write("\n".join(file_lines) + "\n")
+                f.write("\n".join(lines) + "\n")
         except OSError:
             print(f"{RED}Cannot write results file: {output_path}{RESET}", file=sys.stderr)
 
 
+def _format_ms(value: float | None) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def _uptime_color(uptime: float) -> str:
+    return GREEN if uptime >= 99.0 else YELLOW if uptime >= 90.0 else RED
+
+
+def _format_history_report(report: str, rows: List[Tuple], days: float) -> str:
+    titles = {
+        "uptime": "uptime per host",
+        "trend": "hourly latency trend",
+        "worst": "worst hosts",
+    }
+    lines = [f"{CYAN}Pingy history{RESET} {DIM}{titles[report]}, last {days:g} days{RESET}"]
+    if not rows:
+        lines.append(f"{YELLOW}No results recorded for this period{RESET}")
+        return "\n".join(lines)
+
+    if report == "trend":
+        lines.append(
+            f"{DIM}{'host':<30} {'hour':<16} {'probes':>7} {'uptime':>7} "
+            f"{'avg':>7} {'min':>7} {'max':>7}{RESET}"
+        )
+        for host, hour, probes, uptime, avg, low, high in rows:
+            hour_text = time.strftime("%Y-%m-%d %H:00", time.localtime(hour))
+            lines.append(
+                f"{CYAN}{host:<30}{RESET} {hour_text:<16} {probes:>7} "
+                f"{_uptime_color(uptime)}{uptime:>6.1f}%{RESET} "
+                f"{_format_ms(avg):>7} {_format_ms(low):>7} {_format_ms(high):>7}"
+            )
+        return "\n".join(lines)
+
+    lines.append(f"{DIM}{'host':<30} {'probes':>7} {'uptime':>7} {'avg':>7}{RESET}")
+    for host, probes, uptime, avg in rows:
+        lines.append(
+            f"{CYAN}{host:<30}{RESET} {probes:>7} "
+            f"{_uptime_color(uptime)}{uptime:>6.1f}%{RESET} {_format_ms(avg):>7}"
+        )
+    return "\n".join(lines)
+
+
+def history_report(
+    history_path: str,
+    report: str,
+    days: float = DEFAULT_REPORT_DAYS,
+    hosts: Iterable[str] = (),
+) -> None:
+    host_filter = [h.strip() for h in hosts if h and h.strip()] or None
+    since = time.time() - days * 86400
+    try:
+        store = HistoryStore(history_path)
+    except sqlite3.Error as e:
+        print(f"{RED}Cannot open history database {history_path}: {e}{RESET}", file=sys.stderr)
+        sys.exit(1)
+    try:
+        if report == "uptime":
+            rows = store.uptime(since, host_filter)
+        elif report == "trend":
+            rows = store.latency_trend(since, host_filter)
+        else:
+            rows = store.worst_hosts(since, WORST_HOSTS_LIMIT, host_filter)
+    finally:
+        store.close()
+    print(_format_history_report(report, rows, days))
+
+
+async def _trace(
+    hosts: List[str],
+    rounds: int,
+    max_hops: int,
+    timeout_ms: int,
+    interval_s: float,
+    concurrency: int,
+) -> None:
+    prober = IcmpProber()
+    resolver = Resolver(timeout_ms)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(host: str) -> str:
+        resolution = await resolver.resolve(target_name(host))
+        if not resolution.ok:
+            return _format_trace_result(host, None, [], False, resolution.message)
+        async with semaphore:
+            try:
+                hops, reached = await trace_path(
+                    prober, resolution.family, resolution.address,
+                    rounds, max_hops, timeout_ms, interval_s,
+                )
+            except OSError as e:
+                return _format_trace_result(
+                    host, resolution.address, [], False, e.strerror or str(e)
+                )
+        return _format_trace_result(host, resolution.address, hops, reached)
+
+    tasks = [asyncio.ensure_future(run(host)) for host in hosts]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            print(await finished, flush=True)
+    finally:
+        for task in tasks:
+            task.cancel()
+        prober.close()
+
+
+def trace_hosts(
+    hosts: Iterable[str],
+    rounds: int = DEFAULT_TRACE_ROUNDS,
+    max_hops: int = MAX_HOPS,
+    timeout_ms: int = 2000,
+    interval_s: float = 1.0,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    cleaned_hosts = list(expand_targets(h.strip() for h in hosts if h and h.strip()))
+    if not cleaned_hosts:
+        print(f"{YELLOW}No hosts provided{RESET}", file=sys.stderr)
+        return
+    # Time Exceeded replies only reach ICMP sockets, not the ping command
+    if not native_icmp_available():
+        print(
+            f"{RED}--trace needs ICMP sockets: run as root or allow them with "
+            f"net.ipv4.ping_group_range{RESET}",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    print(f"{CYAN}Pingy path trace{RESET} {DIM}{rounds} rounds, up to {max_hops} hops{RESET}")
+    try:
+        asyncio.run(
+            _trace(cleaned_hosts, rounds, max_hops, timeout_ms, interval_s, concurrency)
+        )
+    except KeyboardInterrupt:
+        print()
+
+
 def _parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(prog="pingy", add_help=True)
-    parser.add_argument("hosts", nargs="*", help="Hosts to ping")
+    parser.add_argument(
+        "hosts",
+        nargs="*",
+        help=(
+            "Hosts to ping; tcp:host:port and tls:host[:port] probe a TCP service instead. "
+            "A host may be a network (10.0.0.0/24) or a range (192.168.1.10-200)"
+        ),
+    )
     parser.add_argument(
         "-f",
         "--file",
@@ -238,7 +1144,49 @@ def _parse_args(argv: List[str]) -> argparse.Namespace:
         dest="timeout",
         type=int,
         default=2000,
-        help="Timeout per host in ms",
+        help="Timeout per host in ms; with --adaptive the starting timeout",
+    )
+    parser.add_argument(
+        "--retries",
+        dest="retries",
+        type=int,
+        default=0,
+        help="Probe a host that did not answer up to this many more times, with backoff",
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        dest="count",
+        type=int,
+        default=None,
+        help=(
+            "Probes sent to each host per check; reports loss, jitter and RTT spread. "
+            f"With --trace the number of rounds (default {DEFAULT_TRACE_ROUNDS})"
+        ),
+    )
+    parser.add_argument(
+        "--pace",
+        dest="pace",
+        type=int,
+        default=DEFAULT_PACE_MS,
+        help="Milliseconds between the probes of one --count burst",
+    )
+    parser.add_argument(
+        "--max-loss",
+        dest="max_loss",
+        type=float,
+        default=DEFAULT_MAX_LOSS,
+        help="A host whose --count burst loses more than this percentage is DOWN",
+    )
+    parser.add_argument(
+        "--adaptive",
+        dest="adaptive",
+        action="store_true",
+        help=(
+            "Derive per-host timeouts from the observed RTT and its variance; "
+            "in watch mode also probe flaky hosts more often. The ping command "
+            "only takes whole seconds, so without ICMP sockets timeouts stay at 1 s or more"
+        ),
     )
     parser.add_argument(
         "-o",
@@ -246,12 +1194,107 @@ def _parse_args(argv: List[str]) -> argparse.Namespace:
         dest="output",
         help="Path to save results to a file",
     )
+    parser.add_argument(
+        "--format",
+        dest="format",
+        choices=FORMATS,
+        default="text",
+        help=(
+            "Result format, streamed as results arrive; without -o jsonl, csv "
+            "and prom are written to stdout. prom writes a node_exporter textfile"
+        ),
+    )
     parser.add_argument(
         "--http",
         dest="http",
         action="store_true",
         help="Also perform HTTP request and show HTTP status code (200, 404, etc.)",
     )
+    # Long option only: ping users type -c for a probe count
+    parser.add_argument(
+        "--concurrency",
+        dest="concurrency",
+        type=int,
+        default=None,
+        help=(
+            f"Maximum number of hosts checked at the same time "
+            f"(default {DEFAULT_CONCURRENCY}, {SWEEP_CONCURRENCY} for address ranges)"
+        ),
+    )
+    parser.add_argument(
+        "--order",
+        dest="order",
+        choices=["completion", "input"],
+        default="completion",
+        help="Print results as they finish or in the order hosts were given",
+    )
+    parser.add_argument(
+        "--prober",
+        dest="prober",
+        choices=["auto", "native", "subprocess"],
+        default="auto",
+        help="Use ICMP sockets (native) or the ping command; auto prefers sockets",
+    )
+    # Long option only: in ping -w is the deadline
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        action="store_true",
+        help="Probe continuously and show live per-host RTT statistics",
+    )
+    parser.add_argument(
+        "--trace",
+        dest="trace",
+        action="store_true",
+        help="Show the path to each host with per-hop loss and latency, like mtr",
+    )
+    parser.add_argument(
+        "--max-hops",
+        dest="max_hops",
+        type=int,
+        default=MAX_HOPS,
+        help="Highest TTL probed by --trace",
+    )
+    parser.add_argument(
+        "-i",
+        "--interval",
+        dest="interval",
+        type=float,
+        default=1.0,
+        help="Seconds between probe rounds in watch and trace mode",
+    )
+    parser.add_argument(
+        "--window",
+        dest="window",
+        type=int,
+        default=DEFAULT_WINDOW,
+        help="Number of recent probes kept per host for watch statistics",
+    )
+    parser.add_argument(
+        "--dns-ttl",
+        dest="dns_ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Longest time in seconds a resolved address is cached in watch mode",
+    )
+    parser.add_argument(
+        "--history",
+        dest="history",
+        help="SQLite file that keeps every result for later --report queries",
+    )
+    parser.add_argument(
+        "--report",
+        dest="report",
+        choices=["uptime", "trend", "worst"],
+        help="Print a report from the --history file instead of probing; hosts filter it",
+    )
+    parser.add_argument(
+        "--days",
+        dest="days",
+        type=float,
+        default=DEFAULT_REPORT_DAYS,
+        help="Period covered by --report, in days",
+    )
     return parser.parse_args(argv)
 
 
@@ -273,14 +1316,72 @@ def main(argv: List[str] | None = None) -> None:
         hosts.extend(_load_hosts_from_file(args.file))
     if args.hosts:
         hosts.extend(args.hosts)
+    if args.report:
+        if not args.history:
+            print(f"{YELLOW}--report needs a --history file{RESET}", file=sys.stderr)
+            sys.exit(1)
+        history_report(args.history, args.report, args.days, hosts)
+        return
     if not hosts:
         print(f"{YELLOW}Provide at least one host or a file with hosts{RESET}")
         sys.exit(1)
+    for host in hosts:
+        try:
+            is_range(host.strip())
+        except ValueError as e:
+            print(f"{RED}{e}{RESET}", file=sys.stderr)
+            sys.exit(1)
+    if args.trace:
+        trace_hosts(
+            hosts,
+            rounds=args.count or DEFAULT_TRACE_ROUNDS,
+            max_hops=args.max_hops,
+            timeout_ms=args.timeout,
+            interval_s=args.interval,
+            concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+        )
+        return
+    if args.adaptive and _adaptive_needs_sockets(hosts, args.prober):
+        print(
+            f"{YELLOW}--adaptive: the ping command rounds timeouts up to whole seconds; "
+            f"use ICMP sockets for sub-second timeouts{RESET}",
+            file=sys.stderr,
+        )
+    if args.watch:
+        watch_hosts(
+            hosts,
+            interval_s=args.interval,
+            timeout_ms=args.timeout,
+            output_path=args.output,
+            check_http=args.http,
+            concurrency=args.concurrency,
+            prober=args.prober,
+            window=args.window,
+            dns_ttl=args.dns_ttl,
+            output_format=args.format,
+            history_path=args.history,
+            retries=args.retries,
+            adaptive=args.adaptive,
+            count=args.count or 1,
+            pace_ms=args.pace,
+            max_loss=args.max_loss,
+        )
+        return
     ping_hosts(
         hosts,
         timeout_ms=args.timeout,
         output_path=args.output,
         check_http=args.http,
+        concurrency=args.concurrency,
+        ordered=args.order == "input",
+        prober=args.prober,
+        output_format=args.format,
+        history_path=args.history,
+        retries=args.retries,
+        adaptive=args.adaptive,
+        count=args.count or 1,
+        pace_ms=args.pace,
+        max_loss=args.max_loss,
     )
 
 
@@ -0,0 +1,211 @@
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Set, TextIO, Tuple
+
+FORMATS = ["text", "jsonl", "csv", "prom"]
+
+FIELDS = [
+    "timestamp",
+    "host",
+    "kind",
+    "ok",
+    "latency_ms",
+    "message",
+    "ping_rc",
+    "address",
+    "dns_ms",
+    "dns_cached",
+    "connect_ms",
+    "tls_ms",
+    "http_status",
+    "http_method",
+    "http_ttfb_ms",
+    "http_total_ms",
+    "http_reused",
+    "attempts",
+    "sent",
+    "received",
+    "loss_pct",
+    "rtt_min_ms",
+    "rtt_p50_ms",
+    "rtt_p95_ms",
+    "rtt_max_ms",
+    "jitter_ms",
+]
+
+# (record field, metric name, help text, scale); millisecond fields are
+# exported in seconds as Prometheus conventions require
+PROM_METRICS = [
+    ("ok", "pingy_up", "Whether the target answered the check (1) or not (0).", None),
+    ("latency_ms", "pingy_latency_seconds", "Round-trip or TCP connect time.", 0.001),
+    ("dns_ms", "pingy_dns_lookup_seconds", "Time spent resolving the target name.", 0.001),
+    ("tls_ms", "pingy_tls_handshake_seconds", "Time spent in the TLS handshake.", 0.001),
+    ("http_status", "pingy_http_status_code", "Status code of the HTTP check.", None),
+    ("http_total_ms", "pingy_http_duration_seconds", "Total time of the HTTP check.", 0.001),
+    ("loss_pct", "pingy_packet_loss_ratio", "Share of --count probes without a reply.", 0.01),
+    ("jitter_ms", "pingy_jitter_seconds", "Mean difference of consecutive RTTs.", 0.001),
+]
+
+
+class ResultWriter(ABC):
+    def __init__(self, stream: TextIO, owned: bool) -> None:
+        self.stream = stream
+        self._owned = owned
+
+    @abstractmethod
+    def write(self, record: Dict) -> None:
+        ...
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self, up_count: int, down_count: int) -> None:
+        self._finish()
+
+    def abort(self) -> None:
+        self._finish()
+
+    def _finish(self) -> None:
+        if self._owned:
+            self.stream.close()
+        else:
+            self.stream.flush()
+
+
+class TextWriter(ResultWriter):
+    # The semicolon-separated file written by -o before --format existed
+    def __init__(self, stream: TextIO, owned: bool) -> None:
+        super().__init__(stream, owned)
+        stream.write("Pingy host availability check\n" + "=" * 40 + "\n")
+
+    def write(self, record: Dict) -> None:
+        status_text = "UP" if record["ok"] else "DOWN"
+        latency = record["latency_ms"]
+        latency_text = f"{latency:.1f} ms" if latency else "-"
+        self.stream.write(f"{record['host']};{status_text};{latency_text};{record['details']}\n")
+        self.stream.flush()
+
+    def close(self, up_count: int, down_count: int) -> None:
+        total = up_count + down_count
+        self.stream.write(f"\nUP: {up_count}, DOWN: {down_count}, TOTAL: {total}\n")
+        super().close(up_count, down_count)
+
+
+class JsonlWriter(ResultWriter):
+    def write(self, record: Dict) -> None:
+        line = json.dumps({name: record.get(name) for name in FIELDS}, ensure_ascii=False)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+class CsvWriter(ResultWriter):
+    def __init__(self, stream: TextIO, owned: bool) -> None:
+        super().__init__(stream, owned)
+        self._writer = csv.DictWriter(stream, fieldnames=FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, record: Dict) -> None:
+        self._writer.writerow(record)
+        self.stream.flush()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PromWriter(ResultWriter):
+    # node_exporter textfile collector format. Samples of one metric must be
+    # contiguous, so each metric is spooled to its own temporary file as
+    # results arrive and the spools are joined on close. With a path the
+    # file is published by an atomic rename, so the collector never reads a
+    # half-written file; the ".tmp" name is ignored by the collector.
+    # The collector rejects repeated label sets, so a target that shows up
+    # twice (e.g. in overlapping ranges) is exported once, and the
+    # pingy_targets totals count exported series, not raw results.
+    def __init__(self, path: str | None) -> None:
+        if path is None:
+            super().__init__(sys.stdout, False)
+            self._tmp_path = None
+        else:
+            self._tmp_path = path + ".tmp"
+            super().__init__(open(self._tmp_path, "w", encoding="utf-8"), True)
+        self._path = path
+        self._spools: List[TextIO] = [
+            tempfile.TemporaryFile("w+", encoding="utf-8") for _ in PROM_METRICS
+        ]
+        self._seen: Set[Tuple[str, str]] = set()
+        self._up = 0
+
+    def write(self, record: Dict) -> None:
+        key = (record["host"], record["kind"])
+        if key in self._seen:
+            return
+        self._seen.add(key)
+        if record["ok"]:
+            self._up += 1
+        labels = (
+            f'target="{_escape_label(record["host"])}",kind="{_escape_label(record["kind"])}"'
+        )
+        for spool, (field, name, _, scale) in zip(self._spools, PROM_METRICS):
+            value = record.get(field)
+            if field == "ok":
+                value = 1 if value else 0
+            elif value is None or field == "dns_ms" and record.get("dns_cached"):
+                continue
+            elif scale is not None:
+                value = value * scale
+            spool.write(f"{name}{{{labels}}} {value:g}\n")
+
+    def close(self, up_count: int, down_count: int) -> None:
+        for spool, (_, name, help_text, _) in zip(self._spools, PROM_METRICS):
+            self.stream.write(f"# HELP {name} {help_text}\n# TYPE {name} gauge\n")
+            spool.seek(0)
+            for line in spool:
+                self.stream.write(line)
+            spool.close()
+        self.stream.write(
+            "# HELP pingy_targets Number of checked targets by state.\n"
+            "# TYPE pingy_targets gauge\n"
+            f'pingy_targets{{state="up"}} {self._up}\n'
+            f'pingy_targets{{state="down"}} {len(self._seen) - self._up}\n'
+            "# HELP pingy_last_run_timestamp_seconds When the check finished.\n"
+            "# TYPE pingy_last_run_timestamp_seconds gauge\n"
+            f"pingy_last_run_timestamp_seconds {time.time():.3f}\n"
+        )
+        super().close(up_count, down_count)
+        if self._tmp_path is not None:
+            os.replace(self._tmp_path, self._path)
+
+    def abort(self) -> None:
+        for spool in self._spools:
+            spool.close()
+        super().abort()
+        if self._tmp_path is not None:
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+
+def open_writer(output_format: str, path: str | None) -> ResultWriter | None:
+    # Without -o the machine-readable formats go to stdout; plain text
+    # output then needs no writer because results are printed as boxes
+    if output_format == "prom":
+        return PromWriter(path)
+    if path is None:
+        if output_format == "text":
+            return None
+        stream, owned = sys.stdout, False
+    else:
+        stream = open(path, "w", encoding="utf-8", newline="" if output_format == "csv" else None)
+        owned = True
+    if output_format == "jsonl":
+        return JsonlWriter(stream, owned)
+    if output_format == "csv":
+        return CsvWriter(stream, owned)
+    return TextWriter(stream, owned)
@@ -0,0 +1,52 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+from icmp import REPLY, UNREACHABLE, IcmpProber
+from stats import RttStats
+
+MAX_HOPS = 30
+DEFAULT_TRACE_ROUNDS = 10
+
+
+@dataclass
+class Hop:
+    ttl: int
+    stats: RttStats
+    # Every address that answered for this TTL; more than one means the
+    # path is load-balanced
+    addresses: List[str] = field(default_factory=list)
+    unreachable: bool = False
+
+
+async def trace_path(
+    prober: IcmpProber,
+    family: int,
+    address: str,
+    rounds: int = DEFAULT_TRACE_ROUNDS,
+    max_hops: int = MAX_HOPS,
+    timeout_ms: int = 2000,
+    interval_s: float = 1.0,
+) -> Tuple[List[Hop], bool]:
+    # MTR-style: every round probes all TTLs at once instead of one hop at a
+    # time. Returns the hops up to the destination and whether it answered.
+    hops = [Hop(ttl, RttStats(rounds)) for ttl in range(1, max_hops + 1)]
+    last_ttl = max_hops
+    reached = False
+    for round_index in range(rounds):
+        if round_index:
+            await asyncio.sleep(interval_s)
+        replies = await asyncio.gather(
+            *(prober.probe(family, address, timeout_ms, ttl) for ttl in range(1, last_ttl + 1))
+        )
+        for hop, (kind, responder, rtt) in zip(hops, replies):
+            hop.stats.add(rtt if kind is not None else None)
+            if responder is not None and responder not in hop.addresses:
+                hop.addresses.append(responder)
+            # Only the first TTL that reaches the end matters; probes with a
+            # larger TTL would just repeat the destination
+            if kind in (REPLY, UNREACHABLE) and hop.ttl <= last_ttl:
+                reached = reached or kind == REPLY
+                hop.unreachable = kind == UNREACHABLE
+                last_ttl = hop.ttl
+    return hops[:last_ttl], reached
@@ -0,0 +1,65 @@
+import asyncio
+import socket
+import ssl
+import time
+from typing import Tuple
+
+
+async def resolve_address(host: str, port: int) -> Tuple[int, str]:
+    loop = asyncio.get_running_loop()
+    infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    infos.sort(key=lambda info: info[0] != socket.AF_INET)
+    family, _, _, _, sockaddr = infos[0]
+    return family, sockaddr[0]
+
+
+async def tcp_probe(
+    host: str,
+    port: int,
+    timeout_ms: int = 2000,
+    tls: bool = False,
+    address: str | None = None,
+) -> Tuple[bool, float | None, float | None, str]:
+    # Returns (ok, connect_ms, tls_ms, message); DNS is resolved before the
+    # clock starts so that connect time is the TCP handshake alone.
+    # connect_ms is None when the handshake never completed.
+    loop = asyncio.get_running_loop()
+    timeout_s = timeout_ms / 1000.0
+    try:
+        if address is None:
+            _, address = await asyncio.wait_for(resolve_address(host, port), timeout_s)
+    except (socket.gaierror, asyncio.TimeoutError):
+        return False, None, None, "unknown host"
+
+    transport = None
+    try:
+        started = time.perf_counter()
+        transport, protocol = await asyncio.wait_for(
+            loop.create_connection(asyncio.Protocol, address, port), timeout_s
+        )
+        connect_ms = (time.perf_counter() - started) * 1000.0
+        if not tls:
+            return True, connect_ms, None, ""
+
+        context = ssl.create_default_context()
+        started = time.perf_counter()
+        try:
+            transport = await asyncio.wait_for(
+                loop.start_tls(transport, protocol, context, server_hostname=host),
+                timeout_s,
+            )
+        except asyncio.TimeoutError:
+            return False, connect_ms, None, "TLS handshake timed out"
+        except ssl.SSLError as e:
+            return False, connect_ms, None, e.reason or "TLS error"
+        tls_ms = (time.perf_counter() - started) * 1000.0
+        return True, connect_ms, tls_ms, ""
+    except asyncio.TimeoutError:
+        return False, None, None, "connect timed out"
+    except ConnectionRefusedError:
+        return False, None, None, "connection refused"
+    except OSError as e:
+        return False, None, None, e.strerror or str(e)
+    finally:
+        if transport is not None:
+            transport.close()
@@ -0,0 +1,110 @@
+import asyncio
+import dataclasses
+import ipaddress
+import socket
+import time
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+try:
+    import dns.asyncresolver
+    import dns.exception
+except ImportError:
+    dns = None
+
+# getaddrinfo does not expose record TTLs, so without dnspython every
+# answer is kept for DEFAULT_TTL seconds
+DEFAULT_TTL = 60.0
+MIN_TTL = 1.0
+NEGATIVE_TTL = 5.0
+DNS_CONCURRENCY = 64
+
+
+@dataclass
+class Resolution:
+    host: str
+    address: str | None
+    family: int = socket.AF_INET
+    dns_ms: float = 0.0
+    cached: bool = False
+    message: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.address is not None
+
+
+class Resolver:
+    def __init__(
+        self,
+        timeout_ms: int = 2000,
+        ttl: float = DEFAULT_TTL,
+        concurrency: int = DNS_CONCURRENCY,
+    ) -> None:
+        self.timeout_s = timeout_ms / 1000.0
+        self.ttl = max(MIN_TTL, ttl)
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._cache: Dict[str, Tuple[float, Resolution]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def _query_dns(self, host: str) -> Tuple[int, str, float]:
+        for rdtype, family in (("A", socket.AF_INET), ("AAAA", socket.AF_INET6)):
+            try:
+                answer = await dns.asyncresolver.resolve(host, rdtype, lifetime=self.timeout_s)
+            except dns.resolver.NoAnswer:
+                continue
+            ttl = min(max(float(answer.rrset.ttl), MIN_TTL), self.ttl)
+            return family, answer[0].to_text(), ttl
+        raise dns.resolver.NoAnswer()
+
+    async def _lookup(self, host: str) -> Tuple[int, str, float]:
+        if dns is not None:
+            try:
+                return await self._query_dns(host)
+            except dns.exception.DNSException:
+                # Names from /etc/hosts or mDNS are only known to the system resolver
+                pass
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        infos.sort(key=lambda info: info[0] != socket.AF_INET)
+        family, _, _, _, sockaddr = infos[0]
+        return family, sockaddr[0], self.ttl
+
+    async def _resolve_fresh(self, host: str) -> Resolution:
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                family, address, ttl = await asyncio.wait_for(self._lookup(host), self.timeout_s)
+            except asyncio.TimeoutError:
+                dns_ms = (time.perf_counter() - started) * 1000.0
+                return Resolution(host, None, dns_ms=dns_ms, message="DNS timed out")
+            except (socket.gaierror, UnicodeError):
+                dns_ms = (time.perf_counter() - started) * 1000.0
+                result = Resolution(host, None, dns_ms=dns_ms, message="unknown host")
+                self._cache[host] = (time.monotonic() + NEGATIVE_TTL, result)
+                return result
+            dns_ms = (time.perf_counter() - started) * 1000.0
+            result = Resolution(host, address, family, dns_ms)
+            self._cache[host] = (time.monotonic() + ttl, result)
+            return result
+
+    async def resolve(self, host: str) -> Resolution:
+        try:
+            literal = ipaddress.ip_address(host)
+        except ValueError:
+            pass
+        else:
+            family = socket.AF_INET if literal.version == 4 else socket.AF_INET6
+            return Resolution(host, str(literal), family)
+
+        entry = self._cache.get(host)
+        if entry is not None and entry[0] > time.monotonic():
+            return dataclasses.replace(entry[1], dns_ms=0.0, cached=True)
+
+        # Concurrent checks of the same name share one lookup
+        lookup = self._inflight.get(host)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._resolve_fresh(host))
+            self._inflight[host] = lookup
+            lookup.add_done_callback(lambda _: self._inflight.pop(host, None))
+        return await asyncio.shield(lookup)
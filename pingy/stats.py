@@ -0,0 +1,117 @@
+import math
+from array import array
+from typing import Dict, List
+
+DEFAULT_WINDOW = 100
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+class RttStats:
+    # Fixed-size ring of the last `window` probes; NaN marks a lost probe,
+    # so memory use does not grow with the number of rounds.
+    def __init__(self, window: int = DEFAULT_WINDOW) -> None:
+        self._samples = array("d", [math.nan] * max(1, window))
+        self._next = 0
+        self._count = 0
+        self._last: float | None = None
+        self.sent = 0
+        self.received = 0
+        self.jitter = 0.0
+        self.last_rtt: float | None = None
+        # Mean absolute difference of consecutive replies; unlike the
+        # smoothed estimator it is meaningful for a short burst
+        self._delta_sum = 0.0
+        self._deltas = 0
+
+    def add(self, rtt: float | None) -> None:
+        self.sent += 1
+        self.last_rtt = rtt
+        self._samples[self._next] = math.nan if rtt is None else rtt
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+        if rtt is None:
+            return
+        self.received += 1
+        # RFC 3550 interarrival jitter estimator
+        if self._last is not None:
+            delta = abs(rtt - self._last)
+            self.jitter += (delta - self.jitter) / 16.0
+            self._delta_sum += delta
+            self._deltas += 1
+        self._last = rtt
+
+    def window(self) -> List[float]:
+        return [self._samples[i] for i in range(self._count)]
+
+    def summary(self) -> Dict[str, float]:
+        window = self.window()
+        replies = sorted(v for v in window if not math.isnan(v))
+        lost = len(window) - len(replies)
+        return {
+            "sent": self.sent,
+            "received": self.received,
+            "loss": lost / len(window) * 100.0 if window else 0.0,
+            "min": replies[0] if replies else 0.0,
+            "avg": sum(replies) / len(replies) if replies else 0.0,
+            "max": replies[-1] if replies else 0.0,
+            "p50": percentile(replies, 50),
+            "p95": percentile(replies, 95),
+            "p99": percentile(replies, 99),
+            "jitter": self.jitter,
+            "ipdv": self._delta_sum / self._deltas if self._deltas else 0.0,
+        }
+
+
+# RFC 6298 retransmission timeout constants, in milliseconds
+MIN_RTO_MS = 200.0
+RTO_GRANULARITY_MS = 10.0
+
+
+class RtoEstimator:
+    # TCP-style timeout: smoothed RTT plus four times its variance. Lost
+    # probes double the timeout (exponential backoff) up to max_ms.
+    def __init__(self, initial_ms: float, max_ms: float) -> None:
+        self.max_ms = max_ms
+        self.rto = min(initial_ms, max_ms)
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+
+    def observe(self, rtt: float | None) -> None:
+        if rtt is None:
+            self.rto = min(self.rto * 2.0, self.max_ms)
+            return
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2.0
+        else:
+            self.rttvar = 0.75 * self.rttvar + 0.25 * abs(self.srtt - rtt)
+            self.srtt = 0.875 * self.srtt + 0.125 * rtt
+        rto = self.srtt + max(RTO_GRANULARITY_MS, 4.0 * self.rttvar)
+        self.rto = min(max(rto, MIN_RTO_MS), self.max_ms)
+
+
+class AdaptiveTimeouts:
+    # Per-host RtoEstimator; hosts start at the configured timeout
+    def __init__(self, initial_ms: float, max_ms: float) -> None:
+        self.initial_ms = initial_ms
+        self.max_ms = max(initial_ms, max_ms)
+        self._estimators: Dict[str, RtoEstimator] = {}
+
+    def _estimator(self, host: str) -> RtoEstimator:
+        estimator = self._estimators.get(host)
+        if estimator is None:
+            estimator = RtoEstimator(self.initial_ms, self.max_ms)
+            self._estimators[host] = estimator
+        return estimator
+
+    def timeout_ms(self, host: str) -> int:
+        return int(math.ceil(self._estimator(host).rto))
+
+    def observe(self, host: str, rtt: float | None) -> None:
+        self._estimator(host).observe(rtt)